@@ -1,4 +1,7 @@
+from typing import Dict, List, Optional
+
 from pydantic import BaseModel, BaseSettings
+from sqlalchemy.engine import make_url
 
 
 class AppContactInfo(BaseModel):
@@ -20,9 +23,97 @@ class DBConfig(BaseModel):
     host: str = "localhost"
     port: str = "3306"
     name: str = "fastcrud"
+    # below this many rows, `total=estimated` falls back to an exact count
+    count_estimate_threshold: int = 100000
+    # rows per statement for bulk inserts and set-based deletes
+    bulk_chunk_size: int = 1000
+    driver: str = "mysql+pymysql"
+    # serve requests through an AsyncSession on `async_driver` instead
+    use_async: bool = False
+    async_driver: str = "mysql+aiomysql"
+    # read-only requests are spread over these, falling back to the primary
+    replicas: List[str] = []
+    # a client's reads stay on the primary for this long after it writes
+    replica_sticky_seconds: int = 5
+    # connection pool of every engine, ignored for SQLite
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+
+    def url(self, use_async: bool = False):
+        driver = self.async_driver if use_async else self.driver
+        if driver.startswith("sqlite"):
+            return f"{driver}:///{self.name}"
+        return f"{driver}://{self.username}:{self.password}@{self.host}:{self.port}/{self.name}"
+
+    def pool_options(self) -> dict:
+        return dict(
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+        )
+
+    def replica_urls(self, use_async: bool = False) -> List[str]:
+        if not use_async:
+            return self.replicas
+        return [
+            str(make_url(url).set(drivername=self.async_driver))
+            for url in self.replicas
+        ]
+
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    # the in-process backend only sees the commits of its own process, so
+    # the row, list and principal caches only use it when the app runs as
+    # one process. None detects it: on under a plain `uvicorn app.main:app`,
+    # off under gunicorn, `uvicorn --workers`/`--reload` or WEB_CONCURRENCY
+    # above 1. Set it to force either way, or plug a shared store in with
+    # app.internal.cache.use_backend to cache with any number of workers
+    single_process: Optional[bool] = None
+    # entries kept by the in-process backend
+    max_entries: int = 10000
+    entity_ttl: float = 60
+    # how long an id is remembered as not found
+    negative_ttl: float = 5
+    # list results go stale through table versions, this bounds memory and
+    # how long a result outlives a version bump the backend lost
+    query_ttl: float = 60
+    # upper bound on how long a revoked role or password stays usable
+    # when the change bypasses the app, e.g. made in the database directly
+    principal_ttl: float = 30
+
+
+class TemplatesConfig(BaseModel):
+    # compiled templates outlive restarts there, a temp directory if unset
+    bytecode_dir: Optional[str] = None
+    # keep what {% cache %} blocks render, e.g. the admin's field displays
+    fragment_cache: bool = False
+    fragment_ttl: float = 300
+
 
-    def url(self):
-        return f"mysql+pymysql://{self.username}:{self.password}@{self.host}:{self.port}/{self.name}"
+class GraphQLConfig(BaseModel):
+    # parsed and validated operations kept per process
+    document_cache_size: int = 1000
+    # how long a persisted query is remembered after it was last registered
+    persisted_query_ttl: float = 86400
+    # operations nesting fields deeper than this are rejected before running
+    max_depth: int = 10
+    # and so are those expected to resolve more objects than this
+    max_cost: int = 50000
+    # objects expected from a relationship list, e.g. {"Category.movies": 200}
+    fan_out: Dict[str, int] = dict()
+    default_fan_out: int = 10
+    # objects expected from a list queried without limit
+    unlimited_list_size: int = 10000
+    # sessions the root fields of a query run on concurrently, at most
+    sessions_per_operation: int = 4
+    # operations a client may post in one request, as a JSON array
+    max_batch_size: int = 10
 
 
 class JWTConfig(BaseModel):
@@ -37,6 +128,9 @@ class AppConfig(BaseSettings):
     app: AppInfo = AppInfo()
     db: DBConfig = DBConfig()
     jwt: JWTConfig = JWTConfig()
+    cache: CacheConfig = CacheConfig()
+    templates: TemplatesConfig = TemplatesConfig()
+    graphql: GraphQLConfig = GraphQLConfig()
 
     class Config:
         env_nested_delimiter = "."
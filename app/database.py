@@ -1,20 +1,67 @@
 from asyncio.log import logger
+from itertools import count
 
 from alembic import command
 from alembic.config import Config
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy_utils import create_database, database_exists
 from sqlmodel import create_engine
 
 from app.config import config as app_config
+from app.internal import compiled_cache
+from app.internal.pool import (
+    MonitoredAsyncAdaptedQueuePool,
+    MonitoredQueuePool,
+    monitor,
+)
 
 
 class Database:
     def __init__(self) -> None:
-        self.engine = create_engine(
-            app_config.db.url(), echo=(app_config.env != "prod")
-        )
+        self.engine = self._create_engine(app_config.db.url(), "primary")
+        self.replicas = [
+            self._create_engine(url, f"replica{i}")
+            for i, url in enumerate(app_config.db.replica_urls())
+        ]
+        self.async_engine = None
+        self.async_replicas = []
+        if app_config.db.use_async:
+            self.async_engine = self._create_engine(
+                app_config.db.url(use_async=True), "async_primary", use_async=True
+            )
+            self.async_replicas = [
+                self._create_engine(url, f"async_replica{i}", use_async=True)
+                for i, url in enumerate(app_config.db.replica_urls(use_async=True))
+            ]
+        self._turn = count()
         self.config = Config("alembic.ini")
 
+    def reader(self, use_async: bool = False):
+        """Next replica engine in round robin, the primary when there is none"""
+        replicas = self.async_replicas if use_async else self.replicas
+        if len(replicas) == 0:
+            return self.async_engine if use_async else self.engine
+        return replicas[next(self._turn) % len(replicas)]
+
+    def _create_engine(self, url: str, name: str, use_async: bool = False):
+        options = dict(echo=(app_config.env != "prod"), pool_logging_name=name)
+        if url.startswith("sqlite"):
+            # a session's connection follows its calls across threadpool threads
+            options["connect_args"] = dict(check_same_thread=False)
+        else:
+            options.update(app_config.db.pool_options())
+            options["poolclass"] = (
+                MonitoredAsyncAdaptedQueuePool if use_async else MonitoredQueuePool
+            )
+        if use_async:
+            engine = create_async_engine(url, **options)
+            sync_engine = engine.sync_engine
+        else:
+            engine = sync_engine = create_engine(url, **options)
+        monitor(name, sync_engine)
+        compiled_cache.watch(name, sync_engine)
+        return engine
+
     def migrate_schema(self):
         if not database_exists(self.engine.url):
             try:
@@ -1,17 +1,62 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import Session
-from starlette.templating import Jinja2Templates
-
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 from app.database import db
+from app.internal.replica import READ_METHODS, use_replica
 from app.internal.repository_manager import RepositoryManager
+from app.internal.templating import templates_for
 
 
 def get_templates():
-    return Jinja2Templates("templates")
+    return templates_for("templates")
+
+
+async def repository_manager(request: Request):
+    async with open_repository_manager(request, request.method in READ_METHODS) as rm:
+        yield rm
+
+
+@asynccontextmanager
+async def open_repository_manager(request: Request, read_only: bool):
+    """
+    RepositoryManager for the current request, backed by an AsyncSession when
+    `db.use_async` is set and bound to a replica when `read_only` allows it.
+    Use `RepositoryManager.run` to call repositories.
+    """
+    replica = use_replica(request, read_only)
+    # lets the caches bound how long they trust what a replica returned
+    info = dict(replica=replica and len(db.replicas) > 0)
+    if db.async_engine is None:
+        engine = db.reader() if replica else db.engine
+        session: Session = Session(engine, autoflush=False, info=info)
+        rm = RepositoryManager(session)
+        try:
+            yield rm
+        except Exception as e:
+            await run_in_threadpool(session.rollback)
+            raise e
+        finally:
+            await rm.close_forks()
+            await run_in_threadpool(session.close)
+        return
+    engine = db.reader(use_async=True) if replica else db.async_engine
+    async with AsyncSession(
+        engine, autoflush=False, sync_session_class=Session, info=info
+    ) as session:
+        rm = RepositoryManager(session.sync_session, session)
+        try:
+            yield rm
+        except Exception as e:
+            await session.rollback()
+            raise e
+        finally:
+            await rm.close_forks()
 
 
-def repository_manager():
+def sync_repository_manager():
     session: Session = Session(db.engine, autoflush=False)
     try:
         yield RepositoryManager(session)
@@ -29,6 +29,9 @@ class AuthorFilter(BaseModelFilter):
     wakeup_day: Union[None, DateTimeFilter, datetime]
     created_at: Union[None, DateTimeFilter, datetime]
     updated_at: Union[None, DateTimeFilter, datetime]
+    movies_count: Union[None, NumberFilter, int]
+    friends_count: Union[None, NumberFilter, int]
+    friends_of_count: Union[None, NumberFilter, int]
     profile: Optional["HasAuthorProfileFilter"]
     manager: Optional["HasManagerFilter"]
     movies: Optional["AnyMovieFilter"]
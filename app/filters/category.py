@@ -3,8 +3,10 @@ from typing import List, Optional, Set, Union
 from common.filters import AnyFilter, HasFilter, NumberFilter, StringFilter
 from fastapi import Query
 from pydantic import Field
+from sqlalchemy import or_
 
 from app.internal.filters import BaseModelFilter, OrderBy
+from app.internal.hierarchy import ancestor_ids, descendant_ids
 from app.models.category import Category
 
 
@@ -21,13 +23,27 @@ class CategoryFilter(BaseModelFilter):
     id: Union[None, NumberFilter, int]
     name: Union[None, StringFilter, str]
     description: Union[None, StringFilter, str]
+    movies_count: Union[None, NumberFilter, int]
     parent: Optional["HasCategoryFilter"]
     movies: Optional["AnyMovieFilter"]
     childs: Optional["AnyCategoryFilter"]
+    descendant_of: Optional[int]
+    ancestor_of: Optional[int]
+    # the category itself and its descendants
+    subtree_of: Optional[int]
     or_: Optional[List["CategoryFilter"]] = Field(None, alias="or")
     and_: Optional[List["CategoryFilter"]] = Field(None, alias="and")
     not_: Optional["CategoryFilter"] = Field(None, alias="not")
 
+    def query_descendant_of(self, id: int):
+        return Category.id.in_(descendant_ids(Category, id))
+
+    def query_ancestor_of(self, id: int):
+        return Category.id.in_(ancestor_ids(Category, id))
+
+    def query_subtree_of(self, id: int):
+        return or_(Category.id == id, Category.id.in_(descendant_ids(Category, id)))
+
 
 class HasCategoryFilter(HasFilter, CategoryFilter):
     pass
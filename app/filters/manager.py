@@ -21,6 +21,7 @@ class ManagerFilter(BaseModelFilter):
     id: Union[None, NumberFilter, int]
     lastname: Union[None, StringFilter, str]
     firstname: Union[None, StringFilter, str]
+    authors_count: Union[None, NumberFilter, int]
     authors: Optional["AnyAuthorFilter"]
     or_: Optional[List["ManagerFilter"]] = Field(None, alias="or")
     and_: Optional[List["ManagerFilter"]] = Field(None, alias="and")
@@ -27,6 +27,7 @@ class MovieFilter(BaseModelFilter):
     release_date: Union[None, DateFilter, date]
     created_at: Union[None, DateTimeFilter, datetime]
     updated_at: Union[None, DateTimeFilter, datetime]
+    authors_count: Union[None, NumberFilter, int]
     preview: Optional["HasMoviePreviewFilter"]
     category: Optional["HasCategoryFilter"]
     authors: Optional["AnyAuthorFilter"]
@@ -0,0 +1,39 @@
+from graphql import GraphQLResolveInfo, OperationType
+
+from app.config import config
+from app.internal.repository_manager import RepositoryManager
+
+
+def get_repository(info: GraphQLResolveInfo) -> RepositoryManager:
+    """
+    Repository of the root field `info` is under. The root fields of a query
+    run concurrently, on up to `graphql.sessions_per_operation` sessions;
+    those of a mutation, of a batch holding one, or of any operation when
+    the engine can't give sessions connections of their own, run one after
+    the other on the request's session.
+    """
+    request = info.context["request"]
+    repository: RepositoryManager = request.state.repository
+    if (
+        info.operation.operation != OperationType.QUERY
+        or not repository.can_fork
+        or not getattr(request.state, "concurrent", True)
+    ):
+        return repository
+    path = info.path
+    while path.prev is not None:
+        path = path.prev
+    repositories = getattr(request.state, "repositories", None)
+    if repositories is None:
+        repositories = request.state.repositories = dict()
+    if path.key not in repositories:
+        count = len(repositories)
+        limit = max(config.graphql.sessions_per_operation, 1)
+        if count == 0:
+            repositories[path.key] = repository
+        elif count < limit:
+            repositories[path.key] = repository.fork()
+        else:
+            # the first `limit` are distinct, the rest take turns on them
+            repositories[path.key] = list(repositories.values())[count % limit]
+    return repositories[path.key]
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import List, NamedTuple
+
+from ariadne.graphql import parse_query, validate_query
+from graphql import DocumentNode, GraphQLError, GraphQLSchema
+from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from app.config import config
+from app.internal import cache
+
+
+def query_hash(query: str) -> str:
+    return sha256(query.encode()).hexdigest()
+
+
+class Document(NamedTuple):
+    node: DocumentNode
+    # what the spec rules found, request-dependent rules run every time
+    errors: List[GraphQLError]
+
+
+class PersistedQueryError(Exception):
+    """Answered as Apollo clients expect, outside of the error formatter"""
+
+    def __init__(self, message: str, code: str, status_code: int) -> None:
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.status_code = status_code
+
+    def response(self) -> dict:
+        return dict(
+            errors=[dict(message=self.message, extensions=dict(code=self.code))]
+        )
+
+
+class DocumentCache:
+    """
+    Operations parsed and validated against `schema`, by the sha256 of
+    their text, so clients repeating the same operations skip both. Also
+    holds the Automatic Persisted Queries registry, in the cache backend.
+    With a shared backend every process serves a hash registered with any
+    of them; with the in-process one, each process answers
+    PERSISTED_QUERY_NOT_FOUND until the client sends it the query once.
+    """
+
+    def __init__(self, schema: GraphQLSchema, max_entries: int) -> None:
+        self.schema = schema
+        self.max_entries = max_entries
+        self.lock = Lock()
+        self.entries: "OrderedDict[str, Document]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str) -> Document:
+        """Parsed and validated `query`, GraphQLError if it does not parse"""
+        key = query_hash(query)
+        with self.lock:
+            document = self.entries.get(key)
+            if document is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return document
+            self.misses += 1
+        node = parse_query(query)
+        document = Document(node, validate_query(self.schema, node))
+        with self.lock:
+            self.entries[key] = document
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return document
+
+    def resolve(self, data):
+        """
+        `data` with the query of a persisted query filled in. A query sent
+        along with its hash is registered once it parses.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("extensions"), dict):
+            return data
+        persisted = data["extensions"].get("persistedQuery")
+        if persisted is None:
+            return data
+        if not isinstance(persisted, dict) or persisted.get("version") != 1:
+            raise PersistedQueryError(
+                "Unsupported persisted query version",
+                "PERSISTED_QUERY_NOT_SUPPORTED",
+                HTTP_400_BAD_REQUEST,
+            )
+        hash = persisted.get("sha256Hash")
+        query = data.get("query")
+        if query is None:
+            value = cache.backend.get(f"apq:{hash}") if isinstance(hash, str) else None
+            if value is None:
+                raise PersistedQueryError(
+                    "PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND", HTTP_200_OK
+                )
+            return {**data, "query": value.decode()}
+        if not isinstance(query, str) or query_hash(query) != hash:
+            raise PersistedQueryError(
+                "provided sha does not match query", "BAD_REQUEST", HTTP_400_BAD_REQUEST
+            )
+        try:
+            self.get(query)
+        except GraphQLError:
+            # reported when executed, not worth remembering
+            return data
+        cache.backend.set(
+            f"apq:{hash}", query.encode(), config.graphql.persisted_query_ttl
+        )
+        return data
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(hits=self.hits, misses=self.misses, size=len(self.entries))
@@ -3,6 +3,8 @@ from fastapi import HTTPException
 from graphql import GraphQLError
 from pydantic import ValidationError
 
+from app.graphql.limits import QueryLimitError
+
 
 def format_error(error: GraphQLError, debug: bool = False) -> dict:
     if isinstance(error.original_error, HTTPException):
@@ -12,6 +14,8 @@ def format_error(error: GraphQLError, debug: bool = False) -> dict:
         )
     elif isinstance(error.original_error, ValidationError):
         return dict(detail=error.original_error.errors(), code=422)
+    elif isinstance(error, QueryLimitError):
+        return dict(error=error.message, code=400, extensions=error.extensions)
     if debug:
         # If debug is enabled, reuse Ariadne's formatting logic
         return ariadne_format_error(error, debug)
@@ -0,0 +1,152 @@
+from typing import Any, Dict, Optional, Tuple, Type
+
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    GraphQLNamedType,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    ValidationRule,
+    get_named_type,
+)
+from graphql.execution.values import get_argument_values
+
+from app.config import config
+
+# what list fields return when `limit` isn't given, as in the resolvers
+DEFAULT_LIMIT = 100
+
+
+class QueryLimitError(GraphQLError):
+    """An operation rejected for its depth or estimated cost"""
+
+
+class QueryLimits(ValidationRule):
+    """
+    Reject operations nesting fields deeper than `graphql.max_depth` or
+    expected to resolve more than `graphql.max_cost` objects. The cost of a
+    field is the number of objects it resolves: `limit` for paginated lists,
+    the expected fan-out of the relationship for other lists, one for the
+    rest, multiplied down the selection. Scalars are free.
+    """
+
+    variables: Optional[Dict[str, Any]] = None
+    operation_name: Optional[str] = None
+
+    def enter_operation_definition(self, node: OperationDefinitionNode, *_):
+        if self.operation_name is not None and (
+            node.name is None or node.name.value != self.operation_name
+        ):
+            return
+        schema = self.context.schema
+        root = {
+            OperationType.QUERY: schema.query_type,
+            OperationType.MUTATION: schema.mutation_type,
+            OperationType.SUBSCRIPTION: schema.subscription_type,
+        }[node.operation]
+        depth, cost = self._measure(node.selection_set, root, False)
+        if depth > config.graphql.max_depth:
+            self.report_error(
+                QueryLimitError(
+                    f"Query depth {depth} exceeds the maximum of "
+                    f"{config.graphql.max_depth}",
+                    node,
+                    extensions=dict(code="QUERY_TOO_DEEP", depth=depth),
+                )
+            )
+        elif cost > config.graphql.max_cost:
+            self.report_error(
+                QueryLimitError(
+                    f"Query cost {cost} exceeds the maximum of "
+                    f"{config.graphql.max_cost}",
+                    node,
+                    extensions=dict(code="QUERY_TOO_COSTLY", cost=cost),
+                )
+            )
+
+    def _measure(
+        self, selection_set: SelectionSetNode, parent: GraphQLNamedType, page: bool
+    ) -> Tuple[int, int]:
+        """Depth and cost of `selection_set`, `page` under a paginated field"""
+        depth, cost = 0, 0
+        for node in selection_set.selections:
+            if isinstance(node, FieldNode):
+                node_depth, node_cost = self._field(node, parent, page)
+            elif isinstance(node, FragmentSpreadNode):
+                fragment = self.context.get_fragment(node.name.value)
+                if fragment is None:
+                    continue
+                condition = self.context.schema.get_type(
+                    fragment.type_condition.name.value
+                )
+                node_depth, node_cost = self._measure(
+                    fragment.selection_set, condition or parent, page
+                )
+            elif isinstance(node, InlineFragmentNode):
+                condition = None
+                if node.type_condition is not None:
+                    condition = self.context.schema.get_type(
+                        node.type_condition.name.value
+                    )
+                node_depth, node_cost = self._measure(
+                    node.selection_set, condition or parent, page
+                )
+            else:
+                continue
+            depth = max(depth, node_depth)
+            cost += node_cost
+        return depth, cost
+
+    def _field(
+        self, node: FieldNode, parent: GraphQLNamedType, page: bool
+    ) -> Tuple[int, int]:
+        if node.selection_set is None or node.name.value.startswith("__"):
+            return 0, 0
+        if not isinstance(parent, GraphQLObjectType):
+            return 0, 0
+        field = parent.fields.get(node.name.value)
+        if field is None:
+            return 0, 0
+        child = get_named_type(field.type)
+        if "limit" in field.args:
+            # the page itself, then `limit` times what is selected on items
+            depth, cost = self._measure(node.selection_set, child, True)
+            return depth + 1, 1 + self._limit(field, node) * cost
+        depth, cost = self._measure(node.selection_set, child, False)
+        multiplier = 1
+        if _is_list(field.type) and not page:
+            key = f"{parent.name}.{node.name.value}"
+            multiplier = config.graphql.fan_out.get(key, config.graphql.default_fan_out)
+        return depth + 1, multiplier * (1 + cost)
+
+    def _limit(self, field, node: FieldNode) -> int:
+        try:
+            limit = get_argument_values(field, node, self.variables).get("limit")
+        except GraphQLError:
+            # bad arguments are reported by the spec rules
+            return DEFAULT_LIMIT
+        if limit is None:
+            return DEFAULT_LIMIT
+        return limit if limit > 0 else config.graphql.unlimited_list_size
+
+
+def _is_list(type_) -> bool:
+    if isinstance(type_, GraphQLNonNull):
+        type_ = type_.of_type
+    return isinstance(type_, GraphQLList)
+
+
+def query_limits(context_value: Any, document, data: dict) -> Tuple[Type, ...]:
+    """`validation_rules` of the server, bound to the operation's variables"""
+
+    class _QueryLimits(QueryLimits):
+        variables = data.get("variables") or dict()
+        operation_name = data.get("operationName")
+
+    return (_QueryLimits,)
@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional
+
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLResolveInfo,
+    InlineFragmentNode,
+    SelectionSetNode,
+)
+
+from app.internal.filters import TotalMode
+from app.internal.loading import Selection
+
+
+def selection(info: GraphQLResolveInfo) -> Selection:
+    """Fields selected under the field being resolved, fragments included"""
+    return _selection(info, [node.selection_set for node in info.field_nodes])
+
+
+def list_selection(info: GraphQLResolveInfo, total: TotalMode):
+    """
+    Selection of the `items` of a ListResponse and the total mode to
+    use, `none` when `total` is not selected
+    """
+    selected = selection(info)
+    if "total" not in selected.fields:
+        total = TotalMode.none
+    return selected.fields.get("items", Selection()), total
+
+
+def _selection(
+    info: GraphQLResolveInfo, selection_sets: List[Optional[SelectionSetNode]]
+) -> Selection:
+    fields: Dict[str, List[Optional[SelectionSetNode]]] = dict()
+    for selection_set in selection_sets:
+        if selection_set is not None:
+            _collect(info, selection_set, fields)
+    return Selection(
+        {
+            name: _selection(info, nested)
+            for name, nested in fields.items()
+            if not name.startswith("__")
+        }
+    )
+
+
+def _collect(
+    info: GraphQLResolveInfo,
+    selection_set: SelectionSetNode,
+    fields: Dict[str, List[Optional[SelectionSetNode]]],
+) -> None:
+    # @skip/@include are ignored, selecting more than used is harmless
+    for node in selection_set.selections:
+        if isinstance(node, FieldNode):
+            fields.setdefault(node.name.value, []).append(node.selection_set)
+        elif isinstance(node, FragmentSpreadNode):
+            fragment = info.fragments.get(node.name.value)
+            if fragment is not None:
+                _collect(info, fragment.selection_set, fields)
+        elif isinstance(node, InlineFragmentNode):
+            _collect(info, node.selection_set, fields)
@@ -1,5 +1,6 @@
 from typing import Any
 
+from app.graphql.context import get_repository
 from app.internal.repository_manager import RepositoryManager
 from app.models.auth import LoginBody
 from app.models.user import UserRegister
@@ -9,16 +10,16 @@ def me(obj: Any, info):
     return None
 
 
-def register(obj: Any, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.user.create(UserRegister(**input))
+async def register(obj: Any, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.user.create, UserRegister(**input))
 
 
-def login(obj: Any, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.user.login(LoginBody(**input))
+async def login(obj: Any, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.user.login, LoginBody(**input))
 
 
-def refresh_token(obj: Any, info, refresh_token: str):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.user.refresh_token(refresh_token)
+async def refresh_token(obj: Any, info, refresh_token: str):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.user.refresh_token, refresh_token)
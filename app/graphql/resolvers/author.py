@@ -1,52 +1,64 @@
 from typing import List, Optional
 
 from app.filters.author import AuthorFilter, AuthorOrderBy
+from app.graphql.context import get_repository
+from app.graphql.lookahead import list_selection
 from app.graphql.response import ListResponse
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, TotalMode
 from app.internal.repository_manager import RepositoryManager
 from app.models.author import AuthorIn, AuthorPatchBody
 
 
-def get_authors(
+async def get_authors(
     _,
     info,
     where: Optional[dict] = None,
     skip=0,
     limit=100,
     order_by: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    total=TotalMode.exact,
 ):
-    repository: RepositoryManager = info.context["request"].state.repository
-    pagination = PaginationQuery(skip, limit)
+    repository: RepositoryManager = get_repository(info)
+    items, total = list_selection(info, TotalMode(total))
+    pagination = PaginationQuery(skip, limit, cursor, total)
     order_by = AuthorOrderBy(order_by)
     if where is not None:
         where = AuthorFilter(**where)
-    total = repository.author.find_all(pagination, where, order_by, count=True)
-    _list = repository.author.find_all(pagination, where, order_by)
-    return ListResponse(total=total, items=_list)
+    page = await repository.run(
+        repository.author.paginate,
+        pagination,
+        where,
+        order_by,
+        items,
+        items.names(),
+    )
+    return ListResponse.from_page(page)
 
 
-def get_one_author(_, info, id: int):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author.find_by_id(id)
+async def get_one_author(_, info, id: int):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.author.find_by_id, id)
 
 
-def create_author(_, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author.create(AuthorIn(**input))
+async def create_author(_, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.author.create, AuthorIn(**input))
 
 
-def update_author(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author.update(id, AuthorIn(**input))
+async def update_author(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.author.update, id, AuthorIn(**input))
 
 
-def patch_author(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author.patch(id, AuthorPatchBody(**input))
+async def patch_author(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.author.patch, id, AuthorPatchBody(**input))
 
 
-def delete_authors(_, info, where: Optional[dict] = None):
-    repository: RepositoryManager = info.context["request"].state.repository
+async def delete_authors(_, info, where: Optional[dict] = None):
+    repository: RepositoryManager = get_repository(info)
     if where is not None:
         where = AuthorFilter(**where)
-    return repository.author.delete(where)
+    response = await repository.run(repository.author.delete, where)
+    return response.count
@@ -2,52 +2,70 @@ from typing import List, Optional
 
 from app.filters.author_profile import (AuthorProfileFilter,
                                         AuthorProfileOrderBy)
+from app.graphql.context import get_repository
+from app.graphql.lookahead import list_selection
 from app.graphql.response import ListResponse
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, TotalMode
 from app.internal.repository_manager import RepositoryManager
 from app.models.author_profile import AuthorProfileIn, AuthorProfilePatchBody
 
 
-def get_author_profiles(
+async def get_author_profiles(
     _,
     info,
     where: Optional[dict] = None,
     skip=0,
     limit=100,
     order_by: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    total=TotalMode.exact,
 ):
-    repository: RepositoryManager = info.context["request"].state.repository
-    pagination = PaginationQuery(skip, limit)
+    repository: RepositoryManager = get_repository(info)
+    items, total = list_selection(info, TotalMode(total))
+    pagination = PaginationQuery(skip, limit, cursor, total)
     order_by = AuthorProfileOrderBy(order_by)
     if where is not None:
         where = AuthorProfileFilter(**where)
-    total = repository.author_profile.find_all(pagination, where, order_by, count=True)
-    _list = repository.author_profile.find_all(pagination, where, order_by)
-    return ListResponse(total=total, items=_list)
+    page = await repository.run(
+        repository.author_profile.paginate,
+        pagination,
+        where,
+        order_by,
+        items,
+        items.names(),
+    )
+    return ListResponse.from_page(page)
 
 
-def get_one_author_profile(_, info, id: int):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author_profile.find_by_id(id)
+async def get_one_author_profile(_, info, id: int):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.author_profile.find_by_id, id)
 
 
-def create_author_profile(_, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author_profile.create(AuthorProfileIn(**input))
+async def create_author_profile(_, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(
+        repository.author_profile.create, AuthorProfileIn(**input)
+    )
 
 
-def update_author_profile(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author_profile.update(id, AuthorProfileIn(**input))
+async def update_author_profile(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(
+        repository.author_profile.update, id, AuthorProfileIn(**input)
+    )
 
 
-def patch_author_profile(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.author_profile.patch(id, AuthorProfilePatchBody(**input))
+async def patch_author_profile(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(
+        repository.author_profile.patch, id, AuthorProfilePatchBody(**input)
+    )
 
 
-def delete_author_profiles(_, info, where: Optional[dict] = None):
-    repository: RepositoryManager = info.context["request"].state.repository
+async def delete_author_profiles(_, info, where: Optional[dict] = None):
+    repository: RepositoryManager = get_repository(info)
     if where is not None:
         where = AuthorProfileFilter(**where)
-    return repository.author_profile.delete(where)
+    response = await repository.run(repository.author_profile.delete, where)
+    return response.count
@@ -1,52 +1,66 @@
 from typing import List, Optional
 
 from app.filters.category import CategoryFilter, CategoryOrderBy
+from app.graphql.context import get_repository
+from app.graphql.lookahead import list_selection
 from app.graphql.response import ListResponse
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, TotalMode
 from app.internal.repository_manager import RepositoryManager
 from app.models.category import CategoryIn, CategoryPatchBody
 
 
-def get_categories(
+async def get_categories(
     _,
     info,
     where: Optional[dict] = None,
     skip=0,
     limit=100,
     order_by: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    total=TotalMode.exact,
 ):
-    repository: RepositoryManager = info.context["request"].state.repository
-    pagination = PaginationQuery(skip, limit)
+    repository: RepositoryManager = get_repository(info)
+    items, total = list_selection(info, TotalMode(total))
+    pagination = PaginationQuery(skip, limit, cursor, total)
     order_by = CategoryOrderBy(order_by)
     if where is not None:
         where = CategoryFilter(**where)
-    total = repository.category.find_all(pagination, where, order_by, count=True)
-    _list = repository.category.find_all(pagination, where, order_by)
-    return ListResponse(total=total, items=_list)
+    page = await repository.run(
+        repository.category.paginate,
+        pagination,
+        where,
+        order_by,
+        items,
+        items.names(),
+    )
+    return ListResponse.from_page(page)
 
 
-def get_one_category(_, info, id: int):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.category.find_by_id(id)
+async def get_one_category(_, info, id: int):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.category.find_by_id, id)
 
 
-def create_category(_, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.category.create(CategoryIn(**input))
+async def create_category(_, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.category.create, CategoryIn(**input))
 
 
-def update_category(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.category.update(id, CategoryIn(**input))
+async def update_category(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.category.update, id, CategoryIn(**input))
 
 
-def patch_category(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.category.patch(id, CategoryPatchBody(**input))
+async def patch_category(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(
+        repository.category.patch, id, CategoryPatchBody(**input)
+    )
 
 
-def delete_categories(_, info, where: Optional[dict] = None):
-    repository: RepositoryManager = info.context["request"].state.repository
+async def delete_categories(_, info, where: Optional[dict] = None):
+    repository: RepositoryManager = get_repository(info)
     if where is not None:
         where = CategoryFilter(**where)
-    return repository.category.delete(where)
+    response = await repository.run(repository.category.delete, where)
+    return response.count
@@ -1,52 +1,64 @@
 from typing import List, Optional
 
 from app.filters.movie import MovieFilter, MovieOrderBy
+from app.graphql.context import get_repository
+from app.graphql.lookahead import list_selection
 from app.graphql.response import ListResponse
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, TotalMode
 from app.internal.repository_manager import RepositoryManager
 from app.models.movie import MovieIn, MoviePatchBody
 
 
-def get_movies(
+async def get_movies(
     _,
     info,
     where: Optional[dict] = None,
     skip=0,
     limit=100,
     order_by: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    total=TotalMode.exact,
 ):
-    repository: RepositoryManager = info.context["request"].state.repository
-    pagination = PaginationQuery(skip, limit)
+    repository: RepositoryManager = get_repository(info)
+    items, total = list_selection(info, TotalMode(total))
+    pagination = PaginationQuery(skip, limit, cursor, total)
     order_by = MovieOrderBy(order_by)
     if where is not None:
         where = MovieFilter(**where)
-    total = repository.movie.find_all(pagination, where, order_by, count=True)
-    _list = repository.movie.find_all(pagination, where, order_by)
-    return ListResponse(total=total, items=_list)
+    page = await repository.run(
+        repository.movie.paginate,
+        pagination,
+        where,
+        order_by,
+        items,
+        items.names(),
+    )
+    return ListResponse.from_page(page)
 
 
-def get_one_movie(_, info, id: int):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie.find_by_id(id)
+async def get_one_movie(_, info, id: int):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.movie.find_by_id, id)
 
 
-def create_movie(_, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie.create(MovieIn(**input))
+async def create_movie(_, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.movie.create, MovieIn(**input))
 
 
-def update_movie(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie.update(id, MovieIn(**input))
+async def update_movie(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.movie.update, id, MovieIn(**input))
 
 
-def patch_movie(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie.patch(id, MoviePatchBody(**input))
+async def patch_movie(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.movie.patch, id, MoviePatchBody(**input))
 
 
-def delete_movies(_, info, where: Optional[dict] = None):
-    repository: RepositoryManager = info.context["request"].state.repository
+async def delete_movies(_, info, where: Optional[dict] = None):
+    repository: RepositoryManager = get_repository(info)
     if where is not None:
         where = MovieFilter(**where)
-    return repository.movie.delete(where)
+    response = await repository.run(repository.movie.delete, where)
+    return response.count
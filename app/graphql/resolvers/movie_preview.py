@@ -1,52 +1,70 @@
 from typing import List, Optional
 
 from app.filters.movie_preview import MoviePreviewFilter, MoviePreviewOrderBy
+from app.graphql.context import get_repository
+from app.graphql.lookahead import list_selection
 from app.graphql.response import ListResponse
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, TotalMode
 from app.internal.repository_manager import RepositoryManager
 from app.models.movie_preview import MoviePreviewIn, MoviePreviewPatchBody
 
 
-def get_movie_previews(
+async def get_movie_previews(
     _,
     info,
     where: Optional[dict] = None,
     skip=0,
     limit=100,
     order_by: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    total=TotalMode.exact,
 ):
-    repository: RepositoryManager = info.context["request"].state.repository
-    pagination = PaginationQuery(skip, limit)
+    repository: RepositoryManager = get_repository(info)
+    items, total = list_selection(info, TotalMode(total))
+    pagination = PaginationQuery(skip, limit, cursor, total)
     order_by = MoviePreviewOrderBy(order_by)
     if where is not None:
         where = MoviePreviewFilter(**where)
-    total = repository.movie_preview.find_all(pagination, where, order_by, count=True)
-    _list = repository.movie_preview.find_all(pagination, where, order_by)
-    return ListResponse(total=total, items=_list)
+    page = await repository.run(
+        repository.movie_preview.paginate,
+        pagination,
+        where,
+        order_by,
+        items,
+        items.names(),
+    )
+    return ListResponse.from_page(page)
 
 
-def get_one_movie_preview(_, info, id: int):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie_preview.find_by_id(id)
+async def get_one_movie_preview(_, info, id: int):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.movie_preview.find_by_id, id)
 
 
-def create_movie_preview(_, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie_preview.create(MoviePreviewIn(**input))
+async def create_movie_preview(_, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(
+        repository.movie_preview.create, MoviePreviewIn(**input)
+    )
 
 
-def update_movie_preview(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie_preview.update(id, MoviePreviewIn(**input))
+async def update_movie_preview(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(
+        repository.movie_preview.update, id, MoviePreviewIn(**input)
+    )
 
 
-def patch_movie_preview(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.movie_preview.patch(id, MoviePreviewPatchBody(**input))
+async def patch_movie_preview(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(
+        repository.movie_preview.patch, id, MoviePreviewPatchBody(**input)
+    )
 
 
-def delete_movie_previews(_, info, where: Optional[dict] = None):
-    repository: RepositoryManager = info.context["request"].state.repository
+async def delete_movie_previews(_, info, where: Optional[dict] = None):
+    repository: RepositoryManager = get_repository(info)
     if where is not None:
         where = MoviePreviewFilter(**where)
-    return repository.movie_preview.delete(where)
+    response = await repository.run(repository.movie_preview.delete, where)
+    return response.count
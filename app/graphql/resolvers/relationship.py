@@ -0,0 +1,157 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple, Type
+
+from ariadne import ObjectType
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import MANYTOONE, RelationshipProperty
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlmodel import Session
+
+from app.graphql.context import get_repository
+from app.internal.base_models import BaseSQLModel
+from app.internal.repository_manager import RepositoryManager
+
+
+class RelationshipLoader:
+    """
+    Loads one relationship of the objects resolved in the same tick of the
+    event loop together, with a single IN query per batch. Loaded values
+    are set on the objects, so reading the attribute again costs nothing.
+    """
+
+    def __init__(self, repository: RepositoryManager, rel: RelationshipProperty):
+        self.repository = repository
+        self.rel = rel
+        self.pending: List[Tuple[Any, asyncio.Future]] = []
+
+    def load(self, obj: Any) -> "asyncio.Future[Any]":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if len(self.pending) == 0:
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        self.pending.append((obj, future))
+        return future
+
+    async def _dispatch(self) -> None:
+        batch, self.pending = self.pending, []
+        try:
+            values = await self.repository.run(
+                self.fetch, self.repository.session, [obj for obj, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), value in zip(batch, values):
+            if not future.done():
+                future.set_result(value)
+
+    def fetch(self, session: Session, objs: List[Any]) -> List[Any]:
+        rel = self.rel
+        unloaded = list(
+            {id(obj): obj for obj in objs if rel.key not in inspect(obj).dict}.values()
+        )
+        if len(unloaded) > 0 and len(rel.synchronize_pairs) == 1:
+            keys = list({_value(obj, self._local) for obj in unloaded} - {None})
+            values = self._query(session, keys) if len(keys) > 0 else dict()
+            for obj in unloaded:
+                key = _value(obj, self._local)
+                value = values.get(key, [])
+                if not rel.uselist:
+                    value = value[0] if len(value) > 0 else None
+                set_committed_value(obj, rel.key, value)
+        return [getattr(obj, rel.key) for obj in objs]
+
+    @property
+    def _local(self):
+        # the column of the parent the others point to, or that points to them
+        if self.rel.secondary is not None:
+            return self.rel.synchronize_pairs[0][0]
+        return self.rel.local_remote_pairs[0][0]
+
+    def _query(self, session: Session, keys: List[Any]) -> Dict[Any, list]:
+        if self.rel.secondary is not None:
+            return self._many_to_many(session, keys)
+        if self.rel.direction is MANYTOONE:
+            return self._many_to_one(session, keys)
+        return self._one_to_many(session, keys)
+
+    def _many_to_one(self, session: Session, keys: List[Any]) -> Dict[Any, list]:
+        remote = self.rel.local_remote_pairs[0][1]
+        target = self.rel.mapper
+        values = dict()
+        if list(target.primary_key) == [remote]:
+            # like lazy loads, objects already in the session are not queried
+            for key in keys:
+                value = session.identity_map.get(identity_key(target.class_, key))
+                if value is not None and not inspect(value).expired:
+                    values[key] = [value]
+            keys = [key for key in keys if key not in values]
+        if len(keys) > 0:
+            stmt = select(target).where(remote.in_(keys))
+            for value in session.execute(stmt).scalars():
+                values[_value(value, remote)] = [value]
+        return values
+
+    def _one_to_many(self, session: Session, keys: List[Any]) -> Dict[Any, list]:
+        remote = self.rel.local_remote_pairs[0][1]
+        target = self.rel.mapper
+        stmt = select(target).where(remote.in_(keys))
+        values = defaultdict(list)
+        for value in session.execute(stmt.order_by(*target.primary_key)).scalars():
+            values[_value(value, remote)].append(value)
+        return values
+
+    def _many_to_many(self, session: Session, keys: List[Any]) -> Dict[Any, list]:
+        # parent.id == link.<local>, link.<remote> == target.id
+        link_local = self.rel.synchronize_pairs[0][1]
+        target_column, link_remote = self.rel.secondary_synchronize_pairs[0]
+        target = self.rel.mapper
+        stmt = (
+            select(target, link_local)
+            .join(self.rel.secondary, link_remote == target_column)
+            .where(link_local.in_(keys))
+            .order_by(*target.primary_key)
+        )
+        values = defaultdict(list)
+        for value, key in session.execute(stmt):
+            values[key].append(value)
+        return values
+
+
+def _value(obj: Any, column) -> Any:
+    return getattr(obj, inspect(obj).mapper.get_property_by_column(column).key)
+
+
+def loader(info, model: Type[BaseSQLModel], name: str) -> RelationshipLoader:
+    """The loader of `model.<name>` on the session `info`'s objects come from"""
+    request = info.context["request"]
+    repository = get_repository(info)
+    loaders = getattr(request.state, "loaders", None)
+    if loaders is None:
+        loaders = request.state.loaders = dict()
+    key = (repository, model, name)
+    if key not in loaders:
+        rel = inspect(model).relationships[name]
+        loaders[key] = RelationshipLoader(repository, rel)
+    return loaders[key]
+
+
+def resolve_relationship(model: Type[BaseSQLModel], name: str):
+    async def resolver(obj, info):
+        if name in inspect(obj).dict:
+            return getattr(obj, name)
+        return await loader(info, model, name).load(obj)
+
+    return resolver
+
+
+def relationship_type(model: Type[BaseSQLModel]) -> ObjectType:
+    """Object type batching the loads of every relationship of `model`"""
+    object_type = ObjectType(model.__name__)
+    for name in inspect(model).relationships.keys():
+        object_type.set_field(name, resolve_relationship(model, name))
+    return object_type
@@ -1,52 +1,64 @@
 from typing import List, Optional
 
 from app.filters.user import UserFilter, UserOrderBy
+from app.graphql.context import get_repository
+from app.graphql.lookahead import list_selection
 from app.graphql.response import ListResponse
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, TotalMode
 from app.internal.repository_manager import RepositoryManager
 from app.models.user import UserIn, UserPatchBody, UserRegister
 
 
-def get_users(
+async def get_users(
     _,
     info,
     where: Optional[dict] = None,
     skip=0,
     limit=100,
     order_by: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    total=TotalMode.exact,
 ):
-    repository: RepositoryManager = info.context["request"].state.repository
-    pagination = PaginationQuery(skip, limit)
+    repository: RepositoryManager = get_repository(info)
+    items, total = list_selection(info, TotalMode(total))
+    pagination = PaginationQuery(skip, limit, cursor, total)
     order_by = UserOrderBy(order_by)
     if where is not None:
         where = UserFilter(**where)
-    total = repository.user.find_all(pagination, where, order_by, count=True)
-    _list = repository.user.find_all(pagination, where, order_by)
-    return ListResponse(total=total, items=_list)
+    page = await repository.run(
+        repository.user.paginate,
+        pagination,
+        where,
+        order_by,
+        items,
+        items.names(),
+    )
+    return ListResponse.from_page(page)
 
 
-def get_one_user(_, info, id: int):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.user.find_by_id(id)
+async def get_one_user(_, info, id: int):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.user.find_by_id, id)
 
 
-def create_user(_, info, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.user.create(UserRegister(**input))
+async def create_user(_, info, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.user.create, UserRegister(**input))
 
 
-def update_user(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.user.update(id, UserIn(**input))
+async def update_user(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.user.update, id, UserIn(**input))
 
 
-def patch_user(_, info, id: int, input):
-    repository: RepositoryManager = info.context["request"].state.repository
-    return repository.user.patch(id, UserPatchBody(**input))
+async def patch_user(_, info, id: int, input):
+    repository: RepositoryManager = get_repository(info)
+    return await repository.run(repository.user.patch, id, UserPatchBody(**input))
 
 
-def delete_users(_, info, where: Optional[dict] = None):
-    repository: RepositoryManager = info.context["request"].state.repository
+async def delete_users(_, info, where: Optional[dict] = None):
+    repository: RepositoryManager = get_repository(info)
     if where is not None:
         where = UserFilter(**where)
-    return repository.user.delete(where)
+    response = await repository.run(repository.user.delete, where)
+    return response.count
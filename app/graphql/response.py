@@ -1,10 +1,23 @@
-from typing import Generic, List, TypeVar
+from typing import Generic, List, Optional, TypeVar
 
 from pydantic.generics import GenericModel
 
+from app.internal.response import Page
+
 T = TypeVar("T")
 
 
 class ListResponse(GenericModel, Generic[T]):
-    total: int
+    total: Optional[int]
     items: List[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    @classmethod
+    def from_page(cls, page: Page) -> "ListResponse":
+        return cls(
+            total=page.total,
+            items=page.items,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+        )
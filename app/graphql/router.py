@@ -1,14 +1,34 @@
 from fastapi import APIRouter, Depends
+from graphql import OperationType
 from starlette.requests import Request
 from starlette.templating import Jinja2Templates
 
-from app.dependencies import get_templates, repository_manager
+from app.dependencies import get_templates, open_repository_manager
 from app.graphql.schema import graphql_app
 from app.internal.repository_manager import RepositoryManager
 
 GraphQLRouter = APIRouter(prefix="/graphql", include_in_schema=False)
 
 
+async def is_query(request: Request) -> bool:
+    """Whether the posted operations only read, so they can go to a replica"""
+    if request.headers.get("Content-Type", "").split(";")[0] != "application/json":
+        return False
+    try:
+        data = await request.json()
+    except ValueError:
+        return False
+    batch = data if isinstance(data, list) else [data]
+    return len(batch) > 0 and all(
+        graphql_app.operation_type(item) == OperationType.QUERY for item in batch
+    )
+
+
+async def graphql_repository_manager(request: Request):
+    async with open_repository_manager(request, await is_query(request)) as rm:
+        yield rm
+
+
 @GraphQLRouter.get("")
 async def graphiql(
     request: Request, templates: Jinja2Templates = Depends(get_templates)
@@ -18,7 +38,8 @@ async def graphiql(
 
 @GraphQLRouter.post("")
 async def graphql(
-    request: Request, repository: RepositoryManager = Depends(repository_manager)
+    request: Request,
+    repository: RepositoryManager = Depends(graphql_repository_manager),
 ):
     request.state.repository = repository
     return await graphql_app.graphql_http_server(request=request)
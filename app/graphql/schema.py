@@ -1,10 +1,10 @@
 from ariadne import (MutationType, QueryType, ScalarType, gql,
                      make_executable_schema)
-from ariadne.asgi import GraphQL
 from common.types import FileInfo
 
 from app.config import config
 from app.graphql.error import format_error
+from app.graphql.limits import query_limits
 from app.graphql.resolvers.auth import login, me, refresh_token, register
 from app.graphql.resolvers.author import (create_author, delete_authors,
                                           get_authors, get_one_author,
@@ -30,8 +30,18 @@ from app.graphql.resolvers.movie_preview import (create_movie_preview,
                                                  get_one_movie_preview,
                                                  patch_movie_preview,
                                                  update_movie_preview)
+from app.graphql.resolvers.relationship import relationship_type
 from app.graphql.resolvers.user import (delete_users, get_one_user, get_users,
                                         patch_user, update_user)
+from app.graphql.server import GraphQLServer
+from app.graphql.timing import FieldTiming
+from app.models.author import Author
+from app.models.author_profile import AuthorProfile
+from app.models.category import Category
+from app.models.manager import Manager
+from app.models.movie import Movie
+from app.models.movie_preview import MoviePreview
+from app.models.user import User
 
 type_defs = gql(open("./app/graphql/schema.graphql").read())
 
@@ -101,7 +111,18 @@ def parse_upload_file(value):
     return FileInfo(content=value)
 
 
-schema = make_executable_schema(type_defs, query, mutation, upload_scalar)
-graphql_app = GraphQL(
-    schema, debug=(config.env != "prod"), error_formatter=format_error
+relationship_types = [
+    relationship_type(model)
+    for model in (Movie, User, MoviePreview, Category, Author, AuthorProfile, Manager)
+]
+
+schema = make_executable_schema(
+    type_defs, query, mutation, upload_scalar, *relationship_types
+)
+graphql_app = GraphQLServer(
+    schema,
+    debug=(config.env != "prod"),
+    error_formatter=format_error,
+    validation_rules=query_limits,
+    extensions=[FieldTiming],
 )
@@ -0,0 +1,176 @@
+import asyncio
+from inspect import isawaitable
+from typing import Any, List, Optional
+
+from ariadne.asgi import GraphQL
+from ariadne.exceptions import HttpError
+from ariadne.extensions import ExtensionManager
+from ariadne.graphql import handle_graphql_errors, handle_query_result, validate_data
+from ariadne.types import ExtensionList, GraphQLResult
+from ariadne.validation.introspection_disabled import IntrospectionDisabledRule
+from graphql import (
+    ExecutionContext,
+    GraphQLError,
+    GraphQLSchema,
+    OperationDefinitionNode,
+    OperationType,
+    execute,
+    validate,
+)
+from graphql.execution import MiddlewareManager
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from app.config import config
+from app.graphql.documents import DocumentCache, PersistedQueryError
+
+
+class GraphQLServer(GraphQL):
+    """
+    ariadne's ASGI app, executing documents out of a `DocumentCache`,
+    serving Automatic Persisted Queries and batches of operations
+    """
+
+    def __init__(self, schema: GraphQLSchema, **kwargs) -> None:
+        super().__init__(schema, **kwargs)
+        self.documents = DocumentCache(schema, config.graphql.document_cache_size)
+
+    async def graphql_http_server(self, request: Request) -> Response:
+        try:
+            data = await self.extract_data_from_request(request)
+        except HttpError as error:
+            return PlainTextResponse(error.message or error.status, status_code=400)
+        if isinstance(data, list):
+            return await self.graphql_batch(request, data)
+        try:
+            data = self.documents.resolve(data)
+        except PersistedQueryError as error:
+            return JSONResponse(error.response(), status_code=error.status_code)
+
+        context_value = await self.get_context_for_request(request)
+        extensions = await self.get_extensions_for_request(request, context_value)
+        middleware = await self.get_middleware_for_request(request, context_value)
+
+        success, result = await self.execute_operation(
+            data, context_value, extensions, middleware
+        )
+        return await self.create_json_response(request, result, success)
+
+    async def graphql_batch(self, request: Request, batch: List[Any]) -> Response:
+        """
+        Results of the operations of `batch`, in order. They share the
+        request's context, so its sessions and relationship loaders, and run
+        concurrently unless one of them is a mutation. Then they run one by
+        one on the request's session alone, the queries after the mutation
+        reading what it committed rather than an older snapshot of a fork.
+        """
+        if len(batch) == 0 or len(batch) > config.graphql.max_batch_size:
+            return PlainTextResponse(
+                f"A batch must hold 1 to {config.graphql.max_batch_size} operations",
+                status_code=400,
+            )
+        context_value = await self.get_context_for_request(request)
+        extensions = await self.get_extensions_for_request(request, context_value)
+        middleware = await self.get_middleware_for_request(request, context_value)
+
+        async def run(data: Any) -> GraphQLResult:
+            try:
+                data = self.documents.resolve(data)
+            except PersistedQueryError as error:
+                return False, error.response()
+            return await self.execute_operation(
+                data, context_value, extensions, middleware
+            )
+
+        if all(self.operation_type(data) == OperationType.QUERY for data in batch):
+            results = await asyncio.gather(*[run(data) for data in batch])
+        else:
+            request.state.concurrent = False
+            results = [await run(data) for data in batch]
+        success = any(success for success, _ in results)
+        return await self.create_json_response(
+            request, [result for _, result in results], success
+        )
+
+    def operation_type(self, data: Any) -> Optional[OperationType]:
+        """Type of the operation `data` runs, None when it can't run"""
+        try:
+            document = self.documents.get(self.documents.resolve(data)["query"]).node
+        except (GraphQLError, PersistedQueryError, KeyError, TypeError):
+            return None
+        operations = [
+            definition
+            for definition in document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+        ]
+        name = data.get("operationName")
+        if name is not None:
+            operations = [
+                operation
+                for operation in operations
+                if operation.name is not None and operation.name.value == name
+            ]
+        if len(operations) != 1:
+            return None
+        return operations[0].operation
+
+    async def execute_operation(
+        self,
+        data: Any,
+        context_value: Any,
+        extensions: ExtensionList,
+        middleware: Optional[MiddlewareManager],
+    ) -> GraphQLResult:
+        """`ariadne.graphql.graphql`, parsing and validating through the cache"""
+        extension_manager = ExtensionManager(extensions, context_value)
+        errors = dict(
+            logger=self.logger,
+            error_formatter=self.error_formatter,
+            debug=self.debug,
+            extension_manager=extension_manager,
+        )
+        with extension_manager.request():
+            try:
+                validate_data(data)
+                document = self.documents.get(data["query"])
+                # the app's rules assume a document the spec rules accept
+                validation_errors = document.errors or self._validate(
+                    context_value, document.node, data
+                )
+                if validation_errors:
+                    return handle_graphql_errors(validation_errors, **errors)
+
+                root_value = self.root_value
+                if callable(root_value):
+                    root_value = root_value(context_value, document.node)
+                    if isawaitable(root_value):
+                        root_value = await root_value
+
+                result = execute(
+                    self.schema,
+                    document.node,
+                    root_value=root_value,
+                    context_value=context_value,
+                    variable_values=data.get("variables"),
+                    operation_name=data.get("operationName"),
+                    execution_context_class=ExecutionContext,
+                    middleware=extension_manager.as_middleware_manager(middleware),
+                )
+                if isawaitable(result):
+                    result = await result
+            except GraphQLError as error:
+                return handle_graphql_errors([error], **errors)
+            return handle_query_result(result, **errors)
+
+    def _validate(self, context_value: Any, document, data: dict) -> list:
+        # the spec rules' findings are cached with the document, only the
+        # app's own rules run here
+        rules = self.validation_rules
+        if callable(rules):
+            rules = rules(context_value, document, data)
+        rules = tuple(rules or ())
+        if not self.introspection:
+            rules += (IntrospectionDisabledRule,)
+        if len(rules) == 0:
+            return []
+        return validate(self.schema, document, rules=rules)
@@ -0,0 +1,69 @@
+import time
+from inspect import isawaitable
+from threading import Lock
+from typing import Any, Dict
+
+from ariadne.contrib.tracing.utils import should_trace
+from ariadne.types import ExtensionSync, Resolver
+from graphql import GraphQLResolveInfo
+
+from app.internal.pool import Histogram
+
+# upper bounds, in seconds, of the resolver time histograms
+RESOLVE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class FieldTimings:
+    """Time spent in the resolvers of each `Type.field`, default ones aside"""
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.fields: Dict[str, Histogram] = dict()
+
+    def observe(self, field: str, seconds: float) -> None:
+        with self.lock:
+            histogram = self.fields.get(field)
+            if histogram is None:
+                histogram = self.fields[field] = Histogram(RESOLVE_BUCKETS)
+            histogram.observe(seconds)
+
+    def stats(self) -> Dict[str, dict]:
+        """Per field, the most time-consuming first"""
+        with self.lock:
+            fields = sorted(
+                self.fields.items(), key=lambda item: item[1].total, reverse=True
+            )
+            return {
+                field: dict(total=histogram.total, **histogram.dict())
+                for field, histogram in fields
+            }
+
+
+field_timings = FieldTimings()
+
+
+class FieldTiming(ExtensionSync):
+    """
+    Records how long each resolver takes, awaiting included. Sync so the
+    default resolvers, which are skipped, don't become coroutines.
+    """
+
+    def resolve(
+        self, next_: Resolver, obj: Any, info: GraphQLResolveInfo, **kwargs
+    ):  # pylint: disable=invalid-overridden-method
+        if not should_trace(info):
+            return next_(obj, info, **kwargs)
+        field = f"{info.parent_type.name}.{info.field_name}"
+        started = time.perf_counter()
+        result = next_(obj, info, **kwargs)
+        if isawaitable(result):
+            return _timed(result, field, started)
+        field_timings.observe(field, time.perf_counter() - started)
+        return result
+
+
+async def _timed(result, field: str, started: float) -> Any:
+    try:
+        return await result
+    finally:
+        field_timings.observe(field, time.perf_counter() - started)
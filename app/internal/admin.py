@@ -15,14 +15,19 @@ from app.admin.movie import MovieAdmin
 from app.admin.movie_preview import MoviePreviewAdmin
 from app.admin.user import UserAdmin
 from app.config import config
-from app.dependencies import repository_manager
+from app.dependencies import sync_repository_manager
 from app.internal.base_models import BaseAdminModel
 from app.internal.repository_manager import RepositoryManager
+from app.internal.templating import configure
 from app.models.auth import LoginBody
 from app.utils import pydantic_error_to_form_validation_error
 
 
 class Admin(BaseAdmin):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        configure(self.templates.env)
+
     def datasource(self, request: Request, model: BaseAdminModel) -> str:
         return request.url_for(model.datasource())
 
@@ -49,7 +54,7 @@ class Admin(BaseAdmin):
         self,
         request: Request,
         callback_url: Optional[str] = Query(None),
-        rm: RepositoryManager = Depends(repository_manager),
+        rm: RepositoryManager = Depends(sync_repository_manager),
     ):
         if request.method == "GET":
             return await super().render_login(request)
@@ -101,7 +106,7 @@ class Admin(BaseAdmin):
         model: Optional[str] = Query(None),
         action: Optional[str] = Query(None),
         id: Optional[str] = Query(None),
-        rm: RepositoryManager = Depends(repository_manager),
+        rm: RepositoryManager = Depends(sync_repository_manager),
     ):
         request.state.rm = rm
         if await self.authentication_required(request, rm):
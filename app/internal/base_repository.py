@@ -1,18 +1,45 @@
-from typing import Generic, List, Optional, Type, TypeVar, Union
+import json
+from hashlib import sha1
+from typing import (
+    Dict,
+    FrozenSet,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi import HTTPException
-from sqlalchemy import func
+from pydantic import BaseModel
+from sqlalchemy import func, inspect, null
+from sqlalchemy.orm.util import identity_key
 from sqlmodel import Session, select
+from starlette.datastructures import URL
 from starlette.status import HTTP_404_NOT_FOUND, HTTP_422_UNPROCESSABLE_ENTITY
 
+from app.config import config
+
 from .base_models import BaseSQLModel
-from .filters import BaseModelFilter, OrderBy, PaginationQuery
-from .response import CountResponse
+from .bulk import bulk_delete, bulk_save
+from .cache import coherent, entity_cache, query_cache, tables_of
+from .conditional import Validators, settled, url_shape
+from .count import count_stmt, estimated_count
+from .cursor import Keyset, decode_cursor, encode_cursor, keyset_order, keyset_predicate
+from .filters import BaseModelFilter, OrderBy, PaginationQuery, TotalMode
+from .loading import load_options, tables_read
+from .response import BulkResponse, CountResponse, Page
 
 T = TypeVar("T", bound=BaseSQLModel)
 
 
 class BaseRepository(Generic[T]):
+    # unique column identifying rows in bulk upserts, besides `id`
+    natural_key: Optional[str] = None
+
     def __init__(self, cls: Type[T], session: Session) -> None:
         self.session = session
         self.cls = cls
@@ -23,29 +50,161 @@ class BaseRepository(Generic[T]):
         where: Optional[BaseModelFilter] = None,
         order_by: Optional[OrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
+    ) -> Union[List[T], int]:
+        query = where.to_query() if where is not None else None
+        tables = self._tables(query)
+        shape = self._shape("count" if count else "all", where, order_by, pagination)
+        key = query_cache.key(tables, shape)
+        cached = query_cache.get(key)
+        if cached is not None:
+            return cached if count else self._fetch_in_order(cached, out)
+        result = self._find_all(pagination, query, order_by, count, out)
+        value = result if count else [entity.id for entity in result]
+        query_cache.set(self.session, tables, key, value)
+        return result
+
+    def _find_all(
+        self,
+        pagination: PaginationQuery,
+        query,
+        order_by: Optional[OrderBy],
+        count: bool,
+        out: Optional[Type[BaseModel]],
     ) -> Union[List[T], int]:
-        stmt = select(self.cls).offset(pagination.skip)
+        stmt = select(self.cls).options(*load_options(self.cls, out))
         if pagination.limit > 0:
             stmt = stmt.limit(pagination.limit)
-        cnt_stmt = select(func.count()).select_from(self.cls)
-        if where is not None:
-            query = where.to_query()
+        if count:
+            return self.session.exec(count_stmt(self.cls, query)).one()
+        if query is not None:
             stmt = stmt.where(query)
-            cnt_stmt = cnt_stmt.where(query)
+        if pagination.cursor is not None:
+            keyset = self._keyset(order_by)
+            values, backward = decode_cursor(keyset, pagination.cursor)
+            stmt = stmt.where(keyset_predicate(keyset, values, backward))
+            stmt = stmt.order_by(*keyset_order(keyset, backward))
+            items = self.session.exec(stmt).all()
+            return items[::-1] if backward else items
+        stmt = stmt.offset(pagination.skip)
         if order_by is not None:
             stmt = stmt.order_by(*order_by.order_list())
-        if count:
-            return self.session.exec(cnt_stmt).one()
         return self.session.exec(stmt).all()
 
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[BaseModelFilter] = None,
+        order_by: Optional[OrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[T]:
+        """
+        Fetch one page of items together with the cursors of its neighbours.
+        When `pagination.cursor` is set, rows are located with a keyset
+        predicate on the `order_by` columns (plus `id`) instead of OFFSET.
+        With `pagination.total == exact` the total is computed in the same
+        statement, as a window over the filtered rows. Relationships read by
+        the `out` model are eager loaded; when `fields` is given only those
+        columns and relationships are loaded. The ids, total and cursors of a
+        page are cached until one of the tables it reads is written to.
+        """
+        query = where.to_query() if where is not None else None
+        tables = self._tables(query)
+        key = query_cache.key(tables, self._shape("page", where, order_by, pagination))
+        cached = query_cache.get(key)
+        if cached is not None:
+            ids, total, next_cursor, prev_cursor = cached
+            items = self._fetch_in_order(ids, out, fields)
+            return Page(items, total, next_cursor, prev_cursor)
+        page = self._paginate(pagination, query, order_by, out, fields)
+        ids = [entity.id for entity in page.items]
+        value = (ids, page.total, page.next_cursor, page.prev_cursor)
+        query_cache.set(self.session, tables, key, value)
+        return page
+
+    def _paginate(
+        self,
+        pagination: PaginationQuery,
+        query,
+        order_by: Optional[OrderBy],
+        out: Optional[Type[BaseModel]],
+        fields: Optional[FrozenSet[str]],
+    ) -> Page[T]:
+        keyset = self._keyset(order_by)
+        total_column = None
+        if pagination.total == TotalMode.exact:
+            if pagination.cursor is None:
+                total_column = func.count().over()
+            else:
+                # the window would only see the rows past the cursor
+                total_column = count_stmt(self.cls, query).scalar_subquery()
+            stmt = select(self.cls, total_column)
+        else:
+            stmt = select(self.cls)
+        if fields is not None:
+            # cursors are built from the keyset columns
+            fields = fields.union(attr.key for attr, _ in keyset)
+        stmt = stmt.options(*load_options(self.cls, out, fields))
+        if query is not None:
+            stmt = stmt.where(query)
+        backward = False
+        if pagination.cursor is not None:
+            values, backward = decode_cursor(keyset, pagination.cursor)
+            stmt = stmt.where(keyset_predicate(keyset, values, backward))
+        else:
+            stmt = stmt.offset(pagination.skip)
+        stmt = stmt.order_by(*keyset_order(keyset, backward))
+        if pagination.limit > 0:
+            stmt = stmt.limit(pagination.limit + 1)
+        total = None
+        if total_column is not None:
+            rows = self.session.exec(stmt).all()
+            items = [row[0] for row in rows]
+            if len(rows) > 0:
+                total = rows[0][1]
+            elif pagination.cursor is None and pagination.skip <= 0:
+                total = 0
+            else:
+                total = self.session.exec(count_stmt(self.cls, query)).one()
+        else:
+            items = self.session.exec(stmt).all()
+            if pagination.total == TotalMode.estimated:
+                total = estimated_count(self.session, self.cls, query)
+        has_more = 0 < pagination.limit < len(items)
+        if has_more:
+            items = items[: pagination.limit]
+        if backward:
+            items.reverse()
+        page = Page(items, total)
+        if pagination.limit > 0 and len(items) > 0:
+            if has_more or backward:
+                page.next_cursor = encode_cursor(keyset, items[-1])
+            if (has_more and backward) or (
+                not backward and (pagination.cursor is not None or pagination.skip > 0)
+            ):
+                page.prev_cursor = encode_cursor(keyset, items[0], backward=True)
+        return page
+
     def find_one(self, where: Optional[BaseModelFilter]) -> Optional[T]:
         stmt = select(self.cls)
         if where is not None:
             stmt = stmt.where(where.to_query())
         return self.session.exec(stmt).one_or_none()
 
-    def find_by_id(self, id: int, raise_exception=True) -> T:
-        entity = self.session.get(self.cls, id)
+    def find_by_id(
+        self,
+        id: int,
+        raise_exception=True,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> T:
+        if self._reads_relationships(out, fields):
+            options = load_options(self.cls, out, fields)
+            entity = self.session.get(self.cls, id, options=options)
+        else:
+            # only columns are read, every one of them is cached
+            entity = entity_cache.load(self.session, self.cls, int(id))
         if entity is None and raise_exception:
             raise HTTPException(
                 HTTP_404_NOT_FOUND, f"Can't find {self.cls.__name__} with id={id}"
@@ -53,16 +212,74 @@ class BaseRepository(Generic[T]):
         return entity
 
     def find_by_ids(self, ids: List[int]) -> List[T]:
-        stmt = select(self.cls).where(self.cls.id.in_(ids))
-        entities = self.session.exec(stmt).all()
-        if len(entities) != len(ids):
-            not_found_ids = list(
-                filter(lambda id: id not in [e.id for e in entities], ids)
-            )
+        """
+        Entities for `ids` in input order, duplicates dropped. Instances
+        already loaded in the session are reused; the others are fetched with
+        IN lists of at most `db.bulk_chunk_size` ids.
+        """
+        ids = list(dict.fromkeys(int(id) for id in ids))
+        found: Dict[int, T] = dict()
+        for id in ids:
+            entity = self.session.identity_map.get(identity_key(self.cls, id))
+            if entity is not None and not inspect(entity).expired:
+                found[id] = entity
+        self._fetch([id for id in ids if id not in found], found)
+        not_found_ids = [id for id in ids if id not in found]
+        if len(not_found_ids) > 0:
             raise HTTPException(
                 HTTP_404_NOT_FOUND,
                 f"{self.cls.__name__} with ids: {not_found_ids} not found",
             )
+        return [found[id] for id in ids]
+
+    def validators(
+        self,
+        url: URL,
+        where: Optional[BaseModelFilter] = None,
+        id: Optional[int] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Validators:
+        """
+        ETag and Last-Modified of the response to `url` showing the rows
+        matching `where` (or the row `id`) through `out`, from their count
+        and latest modification time, without loading them. The versions of
+        the tables read cover changes to joined rows and same-second updates;
+        when they aren't shared by every process they are left out, only
+        responses reading no other table can be found fresh, and none is
+        sent while the latest change's second isn't over.
+        """
+        query = where.to_query() if where is not None else None
+        if id is not None:
+            query = self.cls.id == id
+        modified = self._modified_column()
+        latest = func.max(modified) if modified is not None else null()
+        stmt = select(latest, func.count(), func.now()).select_from(self.cls)
+        if query is not None:
+            stmt = stmt.where(query)
+        last_modified, count, now = self.session.exec(stmt).one()
+        if id is not None and count == 0:
+            raise HTTPException(
+                HTTP_404_NOT_FOUND, f"Can't find {self.cls.__name__} with id={id}"
+            )
+        tables = self._tables(query) | tables_read(self.cls, out, fields)
+        shape = [url_shape(url), str(last_modified), count]
+        own = tables == {self.cls.__table__.name}
+        if coherent():
+            shape += query_cache.versions(tables)
+        etag = f'"{sha1(json.dumps(shape).encode()).hexdigest()}"'
+        if not settled(last_modified, now):
+            # a second change within this second would keep both validators,
+            # the ETag only tells it apart through the versions
+            last_modified = None
+            if not coherent():
+                etag = None
+        exact = id is not None and own
+        return Validators(etag, last_modified, exact, coherent() or own)
+
+    def refresh_all(self, entities: List[T]) -> List[T]:
+        """Reload `entities`, e.g. after a commit, without one SELECT each"""
+        self._fetch([entity.id for entity in entities], dict())
         return entities
 
     def save(self, instance: T) -> T:
@@ -71,11 +288,85 @@ class BaseRepository(Generic[T]):
         self.session.refresh(instance)
         return instance
 
+    def bulk_create(self, items: List[BaseModel], upsert=False) -> BulkResponse:
+        return bulk_save(self.session, self.cls, items, upsert, self.natural_key)
+
     def delete(self, where: Optional[BaseModelFilter]) -> CountResponse:
         if where is None:
             raise HTTPException(HTTP_422_UNPROCESSABLE_ENTITY, "Invalid where filter")
-        items = self.find_all(PaginationQuery(0, -1), where)
-        for item in items:
-            self.session.delete(item)
-        self.session.commit()
-        return CountResponse(count=len(items))
+        count = bulk_delete(self.session, self.cls, where.to_query())
+        return CountResponse(count=count)
+
+    def _fetch(
+        self, ids: List[int], found: Dict[int, T], options: Sequence = ()
+    ) -> Dict[int, T]:
+        size = max(config.db.bulk_chunk_size, 1)
+        for start in range(0, len(ids), size):
+            stmt = select(self.cls).where(self.cls.id.in_(ids[start : start + size]))
+            for entity in self.session.exec(stmt.options(*options)):
+                found[entity.id] = entity
+        return found
+
+    def _fetch_in_order(
+        self,
+        ids: List[int],
+        out: Optional[Type[BaseModel]],
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> List[T]:
+        found = self._fetch(ids, dict(), load_options(self.cls, out, fields))
+        return [found[id] for id in ids if id in found]
+
+    def _modified_column(self):
+        columns = self.cls.__table__.columns
+        if "updated_at" not in columns:
+            return columns.get("created_at")
+        if "created_at" not in columns:
+            return columns.updated_at
+        # updated_at stays NULL until the first update
+        return func.coalesce(columns.updated_at, columns.created_at)
+
+    def _tables(self, query) -> Set[str]:
+        return tables_of(query) | {self.cls.__table__.name}
+
+    def _shape(
+        self,
+        kind: str,
+        where: Optional[BaseModelFilter],
+        order_by: Optional[OrderBy],
+        pagination: PaginationQuery,
+    ) -> str:
+        """Canonical form of a list query, equal for equivalent requests"""
+        return json.dumps(
+            [
+                kind,
+                self.cls.__name__,
+                where.dict(exclude_unset=True) if where is not None else None,
+                [
+                    (attr.key, desc)
+                    for attr, desc in (order_by.order_pairs() if order_by else [])
+                ],
+                pagination.skip,
+                pagination.limit,
+                pagination.cursor,
+                pagination.total,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+
+    def _reads_relationships(
+        self, out: Optional[Type[BaseModel]], fields: Optional[FrozenSet[str]]
+    ) -> bool:
+        if out is None:
+            return False
+        relationships = inspect(self.cls).relationships
+        return any(
+            name in relationships and (fields is None or name in fields)
+            for name in out.__fields__
+        )
+
+    def _keyset(self, order_by: Optional[OrderBy]) -> Keyset:
+        keyset = order_by.order_pairs() if order_by is not None else []
+        if all(attr.key != "id" for attr, _ in keyset):
+            keyset.append((self.cls.id, False))
+        return keyset
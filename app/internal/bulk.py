@@ -0,0 +1,227 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from common.types import FileField
+from pydantic import BaseModel
+from sqlalchemy import Table, delete, insert, inspect, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import MANYTOMANY, ONETOMANY
+from sqlalchemy.sql.dml import Insert
+from sqlmodel import Session
+
+from app.config import config
+
+from .cache import mark_changed
+from .counters import touch
+from .response import BulkItemStatus, BulkResponse, BulkStatus
+
+
+def bulk_save(
+    session: Session,
+    cls,
+    items: List[BaseModel],
+    upsert: bool = False,
+    natural_key: Optional[str] = None,
+) -> BulkResponse:
+    """
+    Insert `items` with one executemany per chunk of
+    `db.bulk_chunk_size` rows. With `upsert`, rows whose `id` (or
+    `natural_key`) already exists are updated instead. Foreign keys and
+    existing keys are checked with one IN query per chunk, so each item gets
+    its own status without the rows being read back. An updated row only
+    has the fields its item sets overwritten, the others keep their value.
+    """
+    table: Table = cls.__table__
+    statuses = [BulkItemStatus(index=index) for index in range(len(items))]
+    seen: Dict[Tuple[str, Any], int] = dict()
+    size = max(config.db.bulk_chunk_size, 1)
+    for start in range(0, len(items), size):
+        chunk = items[start : start + size]
+        rows = [(start + i, _values(item)) for i, item in enumerate(chunk)]
+        given = {start + i: _given(item) for i, item in enumerate(chunk)}
+        rows = _check_foreign_keys(session, table, rows, statuses)
+        groups: Dict[Optional[str], List[Tuple[Dict[str, Any], Set[str]]]] = dict()
+        existing = {
+            key: _existing(session, table, key, [row.get(key) for _, row in rows])
+            for key in {"id", natural_key} - {None}
+        }
+        for index, row in rows:
+            key = _row_key(row, natural_key)
+            status = statuses[index]
+            if key is not None:
+                value = row[key]
+                status.id = row.get("id")
+                if (key, value) in seen or value in existing[key]:
+                    if not upsert:
+                        status.status = BulkStatus.failed
+                        status.detail = f"{cls.__name__} with {key}={value} exists"
+                        continue
+                    status.status = BulkStatus.updated
+                    status.id = existing[key].get(value, status.id)
+                seen[(key, value)] = index
+            if status.status != BulkStatus.updated:
+                status.status = BulkStatus.created
+            groups.setdefault(key if upsert else None, []).append((row, given[index]))
+        for key, values in groups.items():
+            for (_, columns), group in _by_columns(values):
+                stmt = insert(table)
+                where_clause = None
+                if key is not None:
+                    stmt = _on_conflict_update(session, table, key, columns)
+                    where_clause = table.c[key].in_([row[key] for row in group])
+                touch(session, table, where_clause, group)
+                session.execute(stmt, group)
+    # inserted ids are unknown, forget ids cached as missing too
+    mark_changed(session, table)
+    session.commit()
+    return BulkResponse.from_statuses(statuses)
+
+
+def bulk_delete(session: Session, cls, where_clause) -> int:
+    """
+    Delete the rows matching `where_clause` in chunks of
+    `db.bulk_chunk_size` primary keys, committing after each chunk. Rows are
+    removed with set-based statements that do what the ORM would to the
+    rows depending on them: link rows are deleted, foreign keys nulled,
+    counters recounted.
+    Models with FileField columns or delete cascades go through
+    `session.delete` so their hooks run, one chunk of objects at a time.
+    """
+    size = max(config.db.bulk_chunk_size, 1)
+    orm = _needs_orm_delete(cls)
+    count, last = 0, None
+    while True:
+        stmt = select(cls if orm else cls.id)
+        if where_clause is not None:
+            stmt = stmt.where(where_clause)
+        if last is not None:
+            stmt = stmt.where(cls.id > last)
+        rows = session.execute(stmt.order_by(cls.id).limit(size)).scalars().all()
+        if len(rows) == 0:
+            return count
+        if orm:
+            for row in rows:
+                session.delete(row)
+            last = rows[-1].id
+        else:
+            _detach_dependents(session, cls, rows)
+            touch(session, cls.__table__, cls.id.in_(rows))
+            session.execute(delete(cls.__table__).where(cls.id.in_(rows)))
+            mark_changed(session, cls.__table__, rows)
+            last = rows[-1]
+        session.commit()
+        count += len(rows)
+
+
+def _needs_orm_delete(cls) -> bool:
+    if any(isinstance(column.type, FileField) for column in cls.__table__.columns):
+        return True
+    return any("delete" in rel.cascade for rel in inspect(cls).relationships)
+
+
+def _detach_dependents(session: Session, cls, ids: List[int]):
+    for rel in inspect(cls).relationships:
+        if rel.viewonly:
+            continue
+        for local, remote in rel.synchronize_pairs:
+            if rel.direction == MANYTOMANY:
+                touch(session, rel.secondary, remote.in_(ids))
+                stmt = delete(rel.secondary).where(remote.in_(ids))
+                mark_changed(session, rel.secondary)
+            elif rel.direction == ONETOMANY:
+                touch(session, remote.table, remote.in_(ids))
+                stmt = update(remote.table).where(remote.in_(ids))
+                stmt = stmt.values({remote.name: None})
+                mark_changed(session, remote.table)
+            else:
+                continue
+            session.execute(stmt)
+
+
+def _values(item: BaseModel) -> Dict[str, Any]:
+    values = item.dict()
+    if values.get("id") is None:
+        values.pop("id", None)
+    return values
+
+
+def _given(item: BaseModel) -> Set[str]:
+    # what an upsert overwrites, the defaults of the others are only inserted
+    return set(item.dict(exclude_unset=True).keys())
+
+
+def _row_key(row: Dict[str, Any], natural_key: Optional[str]) -> Optional[str]:
+    if row.get("id") is not None:
+        return "id"
+    if natural_key is not None and row.get(natural_key) is not None:
+        return natural_key
+    return None
+
+
+def _by_columns(rows: List[Tuple[Dict[str, Any], Set[str]]]):
+    # executemany needs every parameter set to bind the same columns, and
+    # an upsert to update the same ones
+    groups: Dict[tuple, List[Dict[str, Any]]] = dict()
+    for row, given in rows:
+        columns = (tuple(sorted(row.keys())), tuple(sorted(given & row.keys())))
+        groups.setdefault(columns, []).append(row)
+    return groups.items()
+
+
+def _existing(session: Session, table: Table, key: str, values: list) -> dict:
+    """Map each of `values` already stored in `table.<key>` to its row id"""
+    values = list({v for v in values if v is not None})
+    if len(values) == 0:
+        return dict()
+    column = table.c[key]
+    stmt = select(column, table.c.id).where(column.in_(values))
+    return {value: id for value, id in session.execute(stmt)}
+
+
+def _check_foreign_keys(
+    session: Session,
+    table: Table,
+    rows: List[Tuple[int, Dict[str, Any]]],
+    statuses: List[BulkItemStatus],
+) -> List[Tuple[int, Dict[str, Any]]]:
+    for fk in table.foreign_keys:
+        name = fk.parent.name
+        values = {row[name] for _, row in rows if row.get(name) is not None}
+        if len(values) == 0:
+            continue
+        target = fk.column
+        stmt = select(target).where(target.in_(values))
+        found = set(session.execute(stmt).scalars())
+        valid = []
+        for index, row in rows:
+            if row.get(name) is not None and row[name] not in found:
+                statuses[index].status = BulkStatus.failed
+                statuses[index].detail = f"{name}={row[name]} not found"
+            else:
+                valid.append((index, row))
+        rows = valid
+    return rows
+
+
+def _on_conflict_update(
+    session: Session, table: Table, key: str, columns: Tuple[str, ...]
+) -> Insert:
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        excluded = stmt.inserted
+    elif dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect == "sqlite" else postgresql).insert(table)
+        excluded = stmt.excluded
+    else:
+        raise NotImplementedError(f"Upsert is not supported on {dialect}")
+    values = {name: excluded[name] for name in columns if name not in (key, "id")}
+    for column in table.columns:
+        onupdate = column.onupdate
+        if onupdate is not None and onupdate.is_clause_element:
+            values.setdefault(column.name, onupdate.arg)
+    if len(values) == 0:
+        # nothing to overwrite, the statement still needs an assignment
+        values[key] = excluded[key]
+    if dialect == "mysql":
+        return stmt.on_duplicate_key_update(values)
+    return stmt.on_conflict_do_update(index_elements=[table.c[key]], set_=values)
@@ -0,0 +1,375 @@
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar
+
+from sqlalchemy import Table, event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql.util import find_tables
+from sqlmodel import Session
+
+from app.config import config
+
+from .base_models import BaseSQLModel
+
+T = TypeVar("T", bound=BaseSQLModel)
+
+# stored for ids known not to exist, pickles are never empty
+MISSING = b""
+
+
+class CacheBackend:
+    """
+    Key-value store behind the caches. Shaped after Redis so a client of
+    any store with expiring keys and atomic counters can implement it.
+    """
+
+    # whether every process of the app uses the same store, so that the
+    # invalidations of a commit reach all of them
+    shared = True
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError()
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError()
+
+    def incr(self, key: str) -> int:
+        """Increment the counter at `key`, counters never expire"""
+        raise NotImplementedError()
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU store with per-key expiry, private to each process"""
+
+    shared = False
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.lock = Lock()
+        self.entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # kept apart so the LRU never evicts them
+        self.counters: Dict[str, int] = dict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            if key in self.counters:
+                return str(self.counters[key]).encode()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            return self.counters[key]
+
+
+class _Counted:
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(hits=self.hits, misses=self.misses)
+
+    def _count(self, hit: bool) -> None:
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+class EntityCache(_Counted):
+    """
+    Read-through cache of rows by model and id, storing column values
+    rather than instances so hits are attached to the caller's session as
+    if they had been loaded. Rows written by a session are evicted when it
+    commits; `mark_changed` covers statements bypassing the unit of work.
+    """
+
+    def load(self, session: Session, cls: Type[T], id: int) -> Optional[T]:
+        entity = session.identity_map.get(identity_key(cls, id))
+        if entity is not None and not inspect(entity).expired:
+            return entity
+        if not coherent():
+            return session.get(cls, id)
+        table = cls.__table__.name
+        key = self._key(table, id)
+        if entity is None:
+            value = self.backend.get(key)
+            self._count(value is not None)
+            if value == MISSING:
+                return None
+            if value is not None:
+                return self._attach(session, cls, pickle.loads(value))
+        entity = session.get(cls, id)
+        if table in _written(session):
+            # the row may hold changes this session has not committed
+            return entity
+        if entity is None:
+            self.backend.set(key, MISSING, _ttl(session, config.cache.negative_ttl))
+            return None
+        state = inspect(entity)
+        columns = [attr.key for attr in state.mapper.column_attrs]
+        if all(column in state.dict for column in columns):
+            values = pickle.dumps({column: state.dict[column] for column in columns})
+            self.backend.set(key, values, _ttl(session, config.cache.entity_ttl))
+        return entity
+
+    def invalidate(self, rows: Iterable[Tuple[str, Any]], tables: Iterable[str]):
+        keys = [self._key(table, id) for table, id in rows]
+        if len(keys) > 0:
+            self.backend.delete(*keys)
+        for table in tables:
+            self.backend.incr(f"generation:{table}")
+
+    def _key(self, table: str, id: Any) -> str:
+        generation = self.backend.get(f"generation:{table}")
+        return f"entity:{table}:{int(generation or 0)}:{id}"
+
+    def _attach(self, session: Session, cls: Type[T], values: Dict[str, Any]) -> T:
+        entity = inspect(cls).class_manager.new_instance()
+        for key, value in values.items():
+            # no attribute events: FileField's would re-save stored files
+            set_committed_value(entity, key, value)
+        make_transient_to_detached(entity)
+        session.add(entity)
+        return entity
+
+
+class QueryCache(_Counted):
+    """
+    Results of list queries keyed by their canonical shape and the version
+    of every table they read. Commits bump the version of the tables they
+    write, so stale entries are never looked up again and age out instead.
+    """
+
+    def key(self, tables: Iterable[str], shape: str) -> str:
+        digest = sha1("|".join([shape, *self.versions(tables)]).encode())
+        return f"query:{digest.hexdigest()}"
+
+    def versions(self, tables: Iterable[str]) -> List[str]:
+        return [
+            f"{table}={int(self.backend.get(f'version:{table}') or 0)}"
+            for table in sorted(tables)
+        ]
+
+    def get(self, key: str) -> Optional[Any]:
+        if not coherent():
+            return None
+        value = self.backend.get(key)
+        self._count(value is not None)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, session: Session, tables: Iterable[str], key: str, value: Any):
+        # versions are read before the query runs, a commit racing with it
+        # leaves the result under versions nobody looks up anymore
+        if coherent() and _written(session).isdisjoint(tables):
+            ttl = _ttl(session, config.cache.query_ttl)
+            self.backend.set(key, pickle.dumps(value), ttl)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        for table in tables:
+            self.backend.incr(f"version:{table}")
+
+
+class PrincipalCache(_Counted):
+    """
+    What authorization needs of a user, keyed by user id and a version
+    bumped whenever the user's row is written, so a changed password or
+    role invalidates the entry on commit. Like the row and list caches it
+    is only used when those bumps reach every process. The short TTL
+    bounds staleness when the change bypasses the app altogether.
+    """
+
+    def __init__(self, backend: CacheBackend, table: str) -> None:
+        super().__init__(backend)
+        self.table = table
+
+    def key(self, id: int) -> str:
+        generation = int(self.backend.get("principal_generation") or 0)
+        version = int(self.backend.get(f"principal_version:{id}") or 0)
+        return f"principal:{generation}:{id}:{version}"
+
+    def get(self, key: str) -> Optional[Any]:
+        if not coherent():
+            return None
+        value = self.backend.get(key)
+        self._count(value is not None)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, session: Session, key: str, principal: Any) -> None:
+        # `key` is taken before the user is loaded, a commit racing with the
+        # load bumps the version and the entry is never looked up
+        if coherent() and self.table not in _written(session):
+            ttl = _ttl(session, config.cache.principal_ttl)
+            self.backend.set(key, pickle.dumps(principal), ttl)
+
+    def invalidate(self, rows: Iterable[Tuple[str, Any]], tables: Iterable[str]):
+        for table, id in rows:
+            if table == self.table:
+                self.backend.incr(f"principal_version:{id}")
+        if self.table in tables:
+            self.backend.incr("principal_generation")
+
+
+backend = MemoryBackend(config.cache.max_entries)
+entity_cache = EntityCache(backend)
+query_cache = QueryCache(backend)
+principal_cache = PrincipalCache(backend, "user")
+
+
+def use_backend(store: CacheBackend) -> None:
+    """Keep the caches in `store`, e.g. a Redis client, from now on"""
+    global backend
+    backend = store
+    entity_cache.backend = store
+    query_cache.backend = store
+    principal_cache.backend = store
+
+
+def coherent() -> bool:
+    """
+    Whether the caches invalidated by commits can be used: every process
+    sees the invalidations of the others when the backend is shared, or
+    when the app runs as a single process
+    """
+    if not config.cache.enabled:
+        return False
+    single = config.cache.single_process
+    return backend.shared or (SINGLE_PROCESS if single is None else single)
+
+
+def _single_process() -> bool:
+    # gunicorn and uvicorn --workers are told their worker count through
+    # WEB_CONCURRENCY, uvicorn's workers and reloaded server are
+    # multiprocessing children, and gunicorn imports the app in its workers
+    if os.environ.get("WEB_CONCURRENCY", "1") != "1":
+        return False
+    return multiprocessing.parent_process() is None and "gunicorn" not in sys.modules
+
+
+SINGLE_PROCESS = _single_process()
+
+
+def tables_of(*clauses) -> Set[str]:
+    """Names of the tables read by `clauses`, subqueries included"""
+    tables = set()
+    for clause in clauses:
+        if clause is None:
+            continue
+        for table in find_tables(clause, check_columns=True, include_aliases=True):
+            table = getattr(table, "element", table)
+            if isinstance(table, Table):
+                tables.add(table.name)
+    return tables
+
+
+def mark_changed(
+    session: Session, table: Table, ids: Optional[Iterable[Any]] = None
+) -> None:
+    """
+    Record rows of `table` written outside the unit of work, every row when
+    `ids` is None, to be evicted from the caches when `session` commits
+    """
+    if ids is None:
+        _pending_tables(session).add(table.name)
+    else:
+        _pending(session).update((table.name, id) for id in ids)
+    _written(session).add(table.name)
+
+
+def _pending(session: Session) -> Set[Tuple[str, Any]]:
+    return session.info.setdefault("cache_rows", set())
+
+
+def _pending_tables(session: Session) -> Set[str]:
+    return session.info.setdefault("cache_tables", set())
+
+
+def _written(session: Session) -> Set[str]:
+    return session.info.setdefault("cache_written", set())
+
+
+def _ttl(session: Session, ttl: float) -> float:
+    if session.info.get("replica", False):
+        # what a lagging replica returns is only trusted that long
+        return min(ttl, config.db.replica_sticky_seconds)
+    return ttl
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    for state in flush_context.states:
+        entity = state.obj()
+        deleted = entity in session.deleted
+        if deleted or entity in session.new or _columns_changed(state):
+            id = state.dict.get("id")
+            if issubclass(state.class_, BaseSQLModel) and id is not None:
+                _pending(session).add((state.class_.__table__.name, id))
+            _written(session).add(state.mapper.local_table.name)
+        for rel in state.mapper.relationships:
+            if rel.secondary is not None and (
+                deleted or state.attrs[rel.key].history.has_changes()
+            ):
+                _written(session).add(rel.secondary.name)
+
+
+def _columns_changed(state) -> bool:
+    return any(
+        state.attrs[attr.key].history.has_changes()
+        for attr in state.mapper.column_attrs
+    )
+
+
+def _after_commit(session: Session) -> None:
+    rows = session.info.pop("cache_rows", set())
+    tables = session.info.pop("cache_tables", set())
+    written = session.info.pop("cache_written", set())
+    if len(rows) > 0 or len(tables) > 0:
+        entity_cache.invalidate(rows, tables)
+        principal_cache.invalidate(rows, tables)
+    if len(written) > 0:
+        query_cache.invalidate(written)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("cache_rows", None)
+    session.info.pop("cache_tables", None)
+    session.info.pop("cache_written", None)
+
+
+event.listen(Session, "after_flush", _after_flush)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
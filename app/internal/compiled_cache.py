@@ -0,0 +1,62 @@
+from threading import Lock
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+# sqlmodel's select() subclasses don't declare they can reuse SQLAlchemy's
+# cache key, which keeps every one of our statements out of the compiled cache
+Select.inherit_cache = True
+SelectOfScalar.inherit_cache = True
+
+
+class CompiledCacheMonitor:
+    """
+    Hits and misses of one engine's compiled statement cache. Statements
+    are cached by structure with their values as bound parameters, so the
+    hit ratio tells how well query shapes (filters included) collapse.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def stats(self) -> dict:
+        cache = self.engine._compiled_cache
+        with self.lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                uncached=self.uncached,
+                size=len(cache) if cache is not None else 0,
+            )
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, many):
+        if context is None or context.compiled is None:
+            return
+        with self.lock:
+            if context.cache_hit == CACHE_HIT:
+                self.hits += 1
+            elif context.cache_hit == CACHE_MISS:
+                self.misses += 1
+            else:
+                self.uncached += 1
+
+
+monitors: Dict[str, CompiledCacheMonitor] = dict()
+
+
+def watch(name: str, engine: Engine) -> Engine:
+    """Register `engine`'s compiled cache under `name` for `compiled_cache_stats`"""
+    monitors[name] = CompiledCacheMonitor(engine)
+    return engine
+
+
+def compiled_cache_stats() -> Dict[str, dict]:
+    return {name: monitor.stats() for name, monitor in monitors.items()}
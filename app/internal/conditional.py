@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from starlette.datastructures import URL
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+
+def url_shape(url: URL) -> str:
+    """Path and sorted query of `url`, equal for equivalent requests"""
+    return f"{url.path}?{'&'.join(sorted(url.query.split('&')))}"
+
+
+def settled(last_modified: Optional[datetime], now: Optional[datetime]) -> bool:
+    """
+    Whether the second `last_modified` falls in is over at `now`, both read
+    from the database's clock. Until then another change can be stored with
+    the same timestamp, second-resolution columns can't tell them apart.
+    """
+    if last_modified is None or now is None:
+        return True
+    if (last_modified.tzinfo is None) != (now.tzinfo is None):
+        last_modified = last_modified.replace(tzinfo=None)
+        now = now.replace(tzinfo=None)
+    return now - last_modified >= timedelta(seconds=1)
+
+
+class Validators:
+    """
+    Strong ETag and Last-Modified of a representation. Last-Modified only
+    answers If-Modified-Since when `exact`, i.e. when it changes with every
+    change of the representation: deleting a row of a list or updating a
+    joined row leaves it as is. Likewise the ETag only answers If-None-Match
+    when `complete`, i.e. when it covers every row the representation reads.
+    Either is None when the representation has none worth sending.
+    """
+
+    def __init__(
+        self,
+        etag: Optional[str],
+        last_modified: Optional[datetime],
+        exact: bool = False,
+        complete: bool = True,
+    ) -> None:
+        self.etag = etag
+        self.last_modified = last_modified
+        if last_modified is not None:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            self.last_modified = last_modified.replace(microsecond=0)
+        self.exact = exact
+        self.complete = complete
+
+    def fresh(self, request: Request) -> bool:
+        """Whether the client's copy is still current, see RFC 7232 §6"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if self.etag is None or not self.complete:
+                return False
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            # weak comparison, as for any If-None-Match
+            tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+            return "*" in tags or self.etag in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or not self.exact:
+            return False
+        if self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified <= since
+
+    def apply(self, response: Response) -> Response:
+        if self.etag is not None:
+            response.headers["ETag"] = self.etag
+        # stored copies must be revalidated, lists can't trust Last-Modified
+        response.headers["Cache-Control"] = "no-cache"
+        if self.last_modified is not None:
+            response.headers["Last-Modified"] = format_datetime(
+                self.last_modified, usegmt=True
+            )
+        return response
+
+    def not_modified(self) -> Response:
+        return self.apply(Response(status_code=HTTP_304_NOT_MODIFIED))
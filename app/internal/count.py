@@ -0,0 +1,66 @@
+from typing import Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+
+from app.config import config
+
+
+def count_stmt(cls, where_clause=None) -> Select:
+    stmt = select(func.count()).select_from(cls)
+    if where_clause is not None:
+        stmt = stmt.where(where_clause)
+    return stmt
+
+
+def estimated_count(session: Session, cls, where_clause=None) -> int:
+    """
+    Row count taken from the planner statistics. Exact counts are used when
+    the dialect has no statistics or the estimate is small enough to count.
+    """
+    if where_clause is None:
+        estimate = _table_rows(session, cls.__tablename__)
+    else:
+        estimate = _explain_rows(session, select(cls.id).where(where_clause))
+    if estimate is None or estimate < config.db.count_estimate_threshold:
+        return session.exec(count_stmt(cls, where_clause)).one()
+    return estimate
+
+
+def _table_rows(session: Session, table: str) -> Optional[int]:
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES"
+            " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+        )
+    elif dialect == "postgresql":
+        stmt = text(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"
+        )
+    else:
+        return None
+    value = session.execute(stmt, dict(name=table)).scalar()
+    return int(value) if value is not None and value >= 0 else None
+
+
+def _explain_rows(session: Session, stmt: Select) -> Optional[int]:
+    connection = session.connection()
+    dialect = connection.dialect
+    if dialect.name not in ("mysql", "postgresql"):
+        return None
+    compiled = stmt.compile(
+        dialect=dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    if dialect.name == "mysql":
+        row = connection.exec_driver_sql(f"EXPLAIN {compiled}", params).first()
+        if row is None or row._mapping["rows"] is None:
+            return None
+        filtered = row._mapping.get("filtered") or 100
+        return int(row._mapping["rows"] * filtered / 100)
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    return int(plan.scalar()[0]["Plan"]["Plan Rows"])
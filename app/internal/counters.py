@@ -0,0 +1,192 @@
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy import Column, Table, event, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session
+
+from .base_models import BaseTable
+from .cache import mark_changed
+
+
+class Counter:
+    """
+    `parent.<column>` holds the number of `child` rows whose `child.<fk>`
+    is the parent's id. Declared with `info=dict(counts="child.fk")` on the
+    counter column.
+    """
+
+    def __init__(self, column: Column, fk: Column) -> None:
+        self.column = column
+        self.parent: Table = column.table
+        self.fk = fk
+
+    @property
+    def name(self) -> str:
+        return f"{self.parent.name}.{self.column.name}"
+
+    def actual(self):
+        """Count computed from `child`, correlated to the parent row"""
+        return (
+            select(func.count())
+            .select_from(self.fk.table)
+            .where(self.fk == self.parent.c.id)
+            .scalar_subquery()
+        )
+
+
+_counters: Dict[Column, Counter] = dict()
+_tables = 0
+
+
+def counters() -> Dict[Column, Counter]:
+    """Counters keyed by the child column they count, read from the metadata"""
+    global _tables
+    tables = BaseTable.metadata.tables
+    # read again whenever models were imported since
+    if len(tables) != _tables:
+        _counters.clear()
+        for table in tables.values():
+            for column in table.columns:
+                counts = column.info.get("counts")
+                if counts is not None:
+                    child, fk = counts.split(".")
+                    fk = tables[child].c[fk]
+                    _counters[fk] = Counter(column, fk)
+        _tables = len(tables)
+    return _counters
+
+
+def touch(
+    session: Session,
+    table: Table,
+    where_clause=None,
+    rows: Iterable[Dict[str, Any]] = (),
+) -> None:
+    """
+    Record the parents counting rows of `table` written outside the unit of
+    work: the rows matching `where_clause`, read before the write, and the
+    values of `rows`. They are recounted on the next flush or commit.
+    """
+    rows = list(rows)
+    for fk, counter in counters().items():
+        if fk.table is not table:
+            continue
+        ids = {row.get(fk.name) for row in rows}
+        if where_clause is not None:
+            stmt = select(fk).distinct().where(where_clause)
+            ids.update(session.execute(stmt).scalars())
+        _touched(session, counter, ids)
+
+
+def recount(session: Session) -> None:
+    """Recount the parents touched so far in `session`"""
+    pending: Dict[str, Set[Any]] = session.info.pop("counters", dict())
+    by_name = {counter.name: counter for counter in counters().values()}
+    for name, ids in pending.items():
+        counter = by_name[name]
+        parent = counter.parent
+        actual = counter.actual()
+        # only rows whose count changed, without firing onupdate defaults:
+        # a new count isn't a modification of the row
+        values = {c.name: c for c in parent.c if c.onupdate is not None}
+        values[counter.column.name] = actual
+        stmt = update(parent).where(parent.c.id.in_(ids), counter.column != actual)
+        session.execute(stmt.values(values))
+        mark_changed(session, parent, ids)
+        _refresh_loaded(session, counter, ids)
+
+
+def reconcile(session: Session) -> Dict[str, int]:
+    """Repair every counter out of step with its table, the repaired rows
+    are counted by counter"""
+    repaired = dict()
+    for counter in counters().values():
+        parent = counter.parent
+        drifted = counter.column != counter.actual()
+        stmt = select(parent.c.id).where(drifted)
+        ids = session.execute(stmt).scalars().all()
+        if len(ids) > 0:
+            _touched(session, counter, ids)
+        repaired[counter.name] = len(ids)
+    recount(session)
+    session.commit()
+    return repaired
+
+
+def _touched(session: Session, counter: Counter, ids: Iterable[Any]) -> None:
+    ids = {id for id in ids if id is not None}
+    if len(ids) > 0:
+        pending = session.info.setdefault("counters", dict())
+        pending.setdefault(counter.name, set()).update(ids)
+
+
+def _refresh_loaded(session: Session, counter: Counter, ids: Set[Any]) -> None:
+    # instances already loaded would keep serving the count they were read with
+    loaded: Dict[Any, List[Any]] = dict()
+    for key, entity in session.identity_map.items():
+        table = getattr(key[0], "__table__", None)
+        if table is counter.parent and key[1][0] in ids:
+            loaded.setdefault(key[1][0], []).append(entity)
+    if len(loaded) == 0:
+        return
+    parent = counter.parent
+    stmt = select(parent.c.id, counter.column).where(parent.c.id.in_(loaded))
+    for id, value in session.execute(stmt):
+        for entity in loaded[id]:
+            set_committed_value(entity, counter.column.key, value)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    for state in flush_context.states:
+        entity = state.obj()
+        deleted = entity in session.deleted
+        new = entity in session.new
+        mapper = state.mapper
+        for column in mapper.local_table.columns:
+            counter = counters().get(column)
+            if counter is None:
+                continue
+            history = state.attrs[mapper.get_property_by_column(column).key].history
+            ids = history.sum() if deleted or new else _changed(history)
+            _touched(session, counter, ids)
+        for rel in mapper.relationships:
+            if rel.secondary is None:
+                continue
+            history = state.attrs[rel.key].history
+            items = history.sum() if deleted else _changed(history)
+            if len(items) == 0:
+                continue
+            for local, remote in rel.synchronize_pairs:
+                if remote in counters():
+                    id = state.dict.get(mapper.get_property_by_column(local).key)
+                    _touched(session, counters()[remote], [id])
+            for local, remote in rel.secondary_synchronize_pairs:
+                if remote in counters():
+                    target = rel.mapper.get_property_by_column(local).key
+                    ids = [getattr(item, target) for item in items if item is not None]
+                    _touched(session, counters()[remote], ids)
+
+
+def _changed(history) -> list:
+    # attributes never loaded have None for history
+    return [*(history.added or ()), *(history.deleted or ())]
+
+
+def _after_flush_postexec(session: Session, flush_context) -> None:
+    recount(session)
+
+
+def _before_commit(session: Session) -> None:
+    # writes made with `touch` and no flush to follow
+    if "counters" in session.info:
+        recount(session)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("counters", None)
+
+
+event.listen(Session, "after_flush", _after_flush)
+event.listen(Session, "after_flush_postexec", _after_flush_postexec)
+event.listen(Session, "before_commit", _before_commit)
+event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Dict, List, Tuple
+
+from fastapi import HTTPException
+from pydantic.json import pydantic_encoder
+from sqlalchemy import and_, false, or_
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
+
+# (column, descending) pairs, always terminated by the primary key
+Keyset = List[Tuple[InstrumentedAttribute, bool]]
+
+
+def encode_cursor(keyset: Keyset, item: Any, backward: bool = False) -> str:
+    values = {attr.key: getattr(item, attr.key) for attr, _ in keyset}
+    raw = json.dumps(dict(v=values, b=backward), default=pydantic_encoder)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(keyset: Keyset, cursor: str) -> Tuple[Dict[str, Any], bool]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = {attr.key: _coerce(attr, payload["v"][attr.key]) for attr, _ in keyset}
+        return values, bool(payload.get("b", False))
+    except Exception:
+        raise HTTPException(HTTP_422_UNPROCESSABLE_ENTITY, "Invalid cursor")
+
+
+def keyset_order(keyset: Keyset, backward: bool = False) -> list:
+    return [attr.asc() if desc == backward else attr.desc() for attr, desc in keyset]
+
+
+def keyset_predicate(keyset: Keyset, values: Dict[str, Any], backward: bool = False):
+    """Rows strictly after `values` in keyset order (before them when `backward`)"""
+    clauses = []
+    for i, (attr, desc) in enumerate(keyset):
+        ties = [_equal(a, values[a.key]) for a, _ in keyset[:i]]
+        clauses.append(and_(*ties, _after(attr, values[attr.key], desc != backward)))
+    if len(clauses) == 1:
+        return clauses[0]
+    return or_(*clauses)
+
+
+def _after(attr: InstrumentedAttribute, value: Any, desc: bool):
+    # MySQL and SQLite both sort NULLs first in ascending order
+    if not desc:
+        return attr.is_not(None) if value is None else attr > value
+    return false() if value is None else or_(attr < value, attr.is_(None))
+
+
+def _equal(attr: InstrumentedAttribute, value: Any):
+    return attr.is_(None) if value is None else attr == value
+
+
+def _coerce(attr: InstrumentedAttribute, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = attr.property.columns[0].type.python_type
+    except NotImplementedError:
+        return value
+    if python_type in (date, datetime, time):
+        return python_type.fromisoformat(value)
+    if issubclass(python_type, Enum):
+        return python_type(value)
+    return value
@@ -1,18 +1,58 @@
-from typing import Type
+from enum import Enum
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Set, Tuple, Type
 
 from common.filters.sqlalchemy import SQLAlchemyModelFilter
 from fastapi import HTTPException, Query
 from fastapi.exceptions import RequestValidationError
-from pydantic import ValidationError
-from querystring_parser import parser
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm.attributes import InstrumentedAttribute
 from starlette.requests import Request
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
+from app.internal.where import WhereSyntaxError, parse_brackets, parse_json
+
+# validated filters kept across requests, keyed by class and raw filter
+WHERE_CACHE_SIZE = 1024
+
+
+class TotalMode(str, Enum):
+    exact = "exact"
+    estimated = "estimated"
+    none = "none"
+
 
 class PaginationQuery:
-    def __init__(self, skip: int = Query(0), limit: int = Query(100)):
+    def __init__(
+        self,
+        skip: int = Query(0),
+        limit: int = Query(100),
+        cursor: Optional[str] = Query(None),
+        total: TotalMode = Query(TotalMode.exact),
+    ):
         self.skip = skip
         self.limit = limit
+        self.cursor = cursor
+        self.total = total
+
+
+class Projection:
+    def __init__(
+        self,
+        fields: Optional[Set[str]] = Query(None),
+        exclude: Optional[Set[str]] = Query(None),
+    ):
+        self.fields = fields
+        self.exclude = exclude
+
+    def names(self, model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+        """Fields of `model` to load and return, None meaning all of them"""
+        if self.fields is None and not self.exclude:
+            return None
+        names = set(model.__fields__.keys())
+        if self.fields is not None:
+            names &= self.fields
+        return frozenset(names - (self.exclude or set()))
 
 
 class OrderBy:
@@ -21,6 +61,11 @@ class OrderBy:
     def order_list(self):
         if self.values is None:
             return [None]
+        return [attr.desc() if desc else attr for attr, desc in self.order_pairs()]
+
+    def order_pairs(self) -> List[Tuple[InstrumentedAttribute, bool]]:
+        if self.values is None:
+            return []
         _list = []
         for value in self.values:
             attr, order = None, "asc"
@@ -30,7 +75,7 @@ class OrderBy:
             else:
                 attr, order = getattr(self.__cls__, value[0], None), value[1]
             if attr is not None:
-                _list.append(attr.desc() if order.lower() == "desc" else attr)
+                _list.append((attr, order.lower() == "desc"))
         return _list
 
 
@@ -39,17 +84,45 @@ class BaseModelFilter(SQLAlchemyModelFilter):
 
     @classmethod
     def from_query(cls: Type["BaseModelFilter"], request: Request):
-        try:
-            if "where" in request.query_params.keys():
-                return cls.parse_raw(request.query_params.get("where"))
-            else:
-                filter = parser.parse("%s" % request.query_params, normalized=True).get(
-                    "where"
-                )
-                if filter is not None:
-                    return cls(**filter)
-        except ValidationError as e:
-            raise RequestValidationError(e.raw_errors)
-        except BaseException as e:
-            raise HTTPException(HTTP_422_UNPROCESSABLE_ENTITY, "Invalid where filter")
+        # parsed once per request, whichever of the router and its
+        # dependencies asks first
+        parsed = getattr(request.state, "where", None)
+        if parsed is None:
+            parsed = request.state.where = dict()
+        if cls not in parsed:
+            parsed[cls] = _from_params(cls, request.query_params.multi_items())
+        return parsed[cls]
+
+
+def _from_params(cls: Type[BaseModelFilter], params: List[Tuple[str, str]]):
+    raw = [value for key, value in params if key == "where"]
+    brackets = tuple((key, value) for key, value in params if key.startswith("where["))
+    if len(raw) + len(brackets) == 0:
         return None
+    if len(raw) > 1 or (len(raw) == 1 and len(brackets) > 0):
+        raise HTTPException(HTTP_422_UNPROCESSABLE_ENTITY, "Invalid where filter")
+    try:
+        # routers narrow the filter to their parent by setting its top-level
+        # fields, on a copy so the cached one stays as validated. The nested
+        # filters are shared and never assigned to.
+        return _parse(cls, raw[0] if len(raw) == 1 else None, brackets).copy()
+    except ValidationError as e:
+        raise RequestValidationError(e.raw_errors)
+    except WhereSyntaxError as e:
+        raise HTTPException(HTTP_422_UNPROCESSABLE_ENTITY, f"Invalid where filter: {e}")
+
+
+@lru_cache(maxsize=WHERE_CACHE_SIZE)
+def _parse(
+    cls: Type[BaseModelFilter],
+    raw: Optional[str],
+    brackets: Tuple[Tuple[str, str], ...],
+) -> BaseModelFilter:
+    if raw is not None:
+        return cls.parse_obj(parse_json(raw))
+    return cls.parse_obj(parse_brackets(brackets))
+
+
+def where_cache_stats() -> dict:
+    info = _parse.cache_info()
+    return dict(hits=info.hits, misses=info.misses, size=info.currsize)
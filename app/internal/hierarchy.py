@@ -0,0 +1,31 @@
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+
+# Trees drawn by a self-referential `parent_id`, walked with recursive CTEs
+# so a whole subtree is one statement. UNION, not UNION ALL, so a cycle
+# in the data ends the walk instead of looping forever.
+
+
+def descendant_ids(cls, id: int) -> Select:
+    """Ids of the rows under `id`, at any depth"""
+    tree = select(cls.id).where(cls.parent_id == id).cte(recursive=True)
+    child = aliased(cls)
+    tree = tree.union(select(child.id).where(child.parent_id == tree.c.id))
+    return select(tree.c.id)
+
+
+def ancestor_ids(cls, id: int) -> Select:
+    """Ids of the rows above `id`, up to its root"""
+    tree = (
+        select(cls.parent_id.label("id"))
+        .where(cls.id == id, cls.parent_id.is_not(None))
+        .cte(recursive=True)
+    )
+    parent = aliased(cls)
+    tree = tree.union(
+        select(parent.parent_id).where(
+            parent.id == tree.c.id, parent.parent_id.is_not(None)
+        )
+    )
+    return select(tree.c.id)
@@ -0,0 +1,139 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Type, Union
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+MAX_DEPTH = 3
+
+
+class Selection:
+    """
+    Fields a GraphQL operation selects on an object, each with the fields
+    selected on the objects it leads to
+    """
+
+    def __init__(self, fields: Optional[Dict[str, "Selection"]] = None) -> None:
+        self.fields = fields or dict()
+        self._hash = hash(frozenset(self.fields.items()))
+
+    def names(self) -> FrozenSet[str]:
+        return frozenset(self.fields)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Selection) and self.fields == other.fields
+
+    def __hash__(self) -> int:
+        return self._hash
+
+
+def load_options(
+    cls,
+    out: Union[Type[BaseModel], Selection, None],
+    fields: Optional[FrozenSet[str]] = None,
+) -> List:
+    """
+    Loader options fetching every relationship that `out` will read from an
+    instance of `cls`: scalar relationships are joined, collections use one
+    extra SELECT ... IN per relationship whatever the number of rows.
+    When `fields` is given, only those columns and relationships are loaded.
+    A `Selection` restricts the columns of related objects too.
+    """
+    if out is None:
+        return []
+    if isinstance(out, Selection):
+        return list(_selection_plan(cls, out, 0, fields))
+    return list(_plan(cls, out, 0, fields))
+
+
+@lru_cache(maxsize=1024)
+def _plan(
+    cls, out: Type[BaseModel], depth: int, fields: Optional[FrozenSet[str]] = None
+) -> Tuple:
+    mapper = inspect(cls)
+    options = []
+    for name, field in out.__fields__.items():
+        if name not in mapper.relationships:
+            continue
+        if fields is not None and name not in fields:
+            continue
+        relationship = mapper.relationships[name]
+        attr = getattr(cls, name)
+        loader = selectinload(attr) if relationship.uselist else joinedload(attr)
+        nested = field.type_
+        if (
+            depth + 1 < MAX_DEPTH
+            and isinstance(nested, type)
+            and issubclass(nested, BaseModel)
+        ):
+            nested_options = _plan(relationship.mapper.class_, nested, depth + 1)
+            if len(nested_options) > 0:
+                loader = loader.options(*nested_options)
+        options.append(loader)
+    if fields is not None:
+        columns = [getattr(cls, name) for name in fields if name in mapper.column_attrs]
+        options.append(load_only(*columns) if len(columns) > 0 else load_only(cls.id))
+    return tuple(options)
+
+
+@lru_cache(maxsize=1024)
+def _selection_plan(
+    cls, selection: Selection, depth: int, fields: Optional[FrozenSet[str]] = None
+) -> Tuple:
+    mapper = inspect(cls)
+    options = []
+    for name, nested in selection.fields.items():
+        if name not in mapper.relationships:
+            continue
+        relationship = mapper.relationships[name]
+        attr = getattr(cls, name)
+        loader = selectinload(attr) if relationship.uselist else joinedload(attr)
+        if depth + 1 < MAX_DEPTH:
+            target = relationship.mapper.class_
+            loader = loader.options(*_selection_plan(target, nested, depth + 1))
+        options.append(loader)
+    names = selection.names() if fields is None else fields
+    # foreign keys are kept for the relationships loaded later on
+    columns = [
+        getattr(cls, attr.key)
+        for attr in mapper.column_attrs
+        if attr.key in names or len(attr.columns[0].foreign_keys) > 0
+    ]
+    options.append(load_only(*columns) if len(columns) > 0 else load_only(cls.id))
+    return tuple(options)
+
+
+@lru_cache(maxsize=1024)
+def tables_read(
+    cls, out: Optional[Type[BaseModel]], fields: Optional[FrozenSet[str]] = None
+) -> FrozenSet[str]:
+    """Tables the `out` representation of a `cls` instance is built from"""
+    return frozenset(_tables_read(cls, out, 0, fields))
+
+
+def _tables_read(
+    cls, out: Optional[Type[BaseModel]], depth: int, fields: Optional[FrozenSet[str]]
+) -> Set[str]:
+    mapper = inspect(cls)
+    tables = {mapper.local_table.name}
+    if out is None:
+        return tables
+    for name, field in out.__fields__.items():
+        if name not in mapper.relationships:
+            continue
+        if fields is not None and name not in fields:
+            continue
+        relationship = mapper.relationships[name]
+        if relationship.secondary is not None:
+            tables.add(relationship.secondary.name)
+        nested = field.type_
+        if (
+            depth + 1 < MAX_DEPTH
+            and isinstance(nested, type)
+            and issubclass(nested, BaseModel)
+        ):
+            tables |= _tables_read(relationship.mapper.class_, nested, depth + 1, None)
+        else:
+            tables.add(relationship.mapper.local_table.name)
+    return tables
@@ -0,0 +1,137 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# upper bounds, in seconds, of the wait and connection age histograms
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+AGE_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 3600.0, 14400.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def dict(self) -> dict:
+        count = sum(self.counts)
+        bounds: List[str] = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return dict(
+            count=count,
+            mean=self.total / count if count > 0 else 0.0,
+            max=self.max,
+            buckets=dict(zip(bounds, self.counts)),
+        )
+
+
+class PoolMonitor:
+    """Checkout counters and timings of one engine's connection pool"""
+
+    def __init__(self, engine: Engine) -> None:
+        self.pool = engine.pool
+        self.lock = Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.overflow_checkouts = 0
+        self.wait = Histogram(WAIT_BUCKETS)
+        self.age = Histogram(AGE_BUCKETS)
+        event.listen(engine, "engine_disposed", self._on_dispose)
+        event.listen(self.pool, "connect", self._on_connect)
+        event.listen(self.pool, "checkout", self._on_checkout)
+        event.listen(self.pool, "checkin", self._on_checkin)
+        event.listen(self.pool, "invalidate", self._on_invalidate)
+
+    def waited(self, seconds: float) -> None:
+        with self.lock:
+            self.wait.observe(seconds)
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = dict(
+                pool=type(self.pool).__name__,
+                connects=self.connects,
+                checkouts=self.checkouts,
+                checkins=self.checkins,
+                invalidations=self.invalidations,
+                overflow_checkouts=self.overflow_checkouts,
+                wait_seconds=self.wait.dict(),
+                connection_age_seconds=self.age.dict(),
+            )
+        if isinstance(self.pool, QueuePool):
+            stats.update(
+                size=self.pool.size(),
+                checked_out=self.pool.checkedout(),
+                idle=self.pool.checkedin(),
+                overflow=self.pool.overflow(),
+            )
+        return stats
+
+    def _on_dispose(self, engine: Engine) -> None:
+        self.pool = engine.pool
+
+    def _on_connect(self, dbapi_connection, record) -> None:
+        record.info["connected_at"] = time.monotonic()
+        with self.lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, record, proxy) -> None:
+        connected_at = record.info.get("connected_at", time.monotonic())
+        with self.lock:
+            self.checkouts += 1
+            self.age.observe(time.monotonic() - connected_at)
+            if isinstance(self.pool, QueuePool) and self.pool.overflow() > 0:
+                self.overflow_checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, record) -> None:
+        with self.lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, record, exception) -> None:
+        with self.lock:
+            self.invalidations += 1
+
+
+monitors: Dict[str, PoolMonitor] = dict()
+
+
+def monitor(name: str, engine: Engine) -> Engine:
+    """Register `engine`'s pool under `name` for `pool_stats`"""
+    monitors[name] = PoolMonitor(engine)
+    return engine
+
+
+def pool_stats() -> Dict[str, dict]:
+    return {name: monitor.stats() for name, monitor in monitors.items()}
+
+
+class _TimedGet:
+    # time spent waiting for (or opening) a connection, queueing included
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_monitor = monitors.get(self._orig_logging_name)
+            if pool_monitor is not None:
+                pool_monitor.waited(time.perf_counter() - started)
+
+
+class MonitoredQueuePool(_TimedGet, QueuePool):
+    pass
+
+
+class MonitoredAsyncAdaptedQueuePool(_TimedGet, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,47 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import config
+
+STICKY_COOKIE = "db_primary_until"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def use_replica(request: Request, read_only: bool) -> bool:
+    """
+    Whether the request may read from a replica. Writes are flagged on the
+    request state so that `ReplicaStickinessMiddleware` pins the client to
+    the primary for `db.replica_sticky_seconds`, letting it read its writes.
+    """
+    if not read_only:
+        request.state.db_write = True
+        return False
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) < time.time()
+    except ValueError:
+        return True
+
+
+class ReplicaStickinessMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or len(config.db.replicas) == 0:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message: Message) -> None:
+            state = scope.get("state", {})
+            if message["type"] == "http.response.start" and state.get("db_write"):
+                ttl = config.db.replica_sticky_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}={time.time() + ttl}; Max-Age={ttl}; Path=/",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
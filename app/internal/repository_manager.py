@@ -1,6 +1,10 @@
-from typing import Any, TypeVar
+import asyncio
+from typing import Any, Callable, List, Optional, TypeVar
 
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.repositories.author import AuthorRepository
 from app.repositories.author_profile import AuthorProfileRepository
@@ -13,11 +17,17 @@ from app.repositories.user import UserRepository
 from .base_models import BaseSQLModel
 
 T = TypeVar("T", bound=BaseSQLModel)
+R = TypeVar("R")
 
 
 class RepositoryManager:
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self, session: Session, async_session: Optional[AsyncSession] = None
+    ) -> None:
         self.session = session
+        self.async_session = async_session
+        self._lock: Optional[asyncio.Lock] = None
+        self.forks: List["RepositoryManager"] = []
         self.movie = MovieRepository(self)
         self.user = UserRepository(self)
         self.movie_preview = MoviePreviewRepository(self)
@@ -26,6 +36,57 @@ class RepositoryManager:
         self.author_profile = AuthorProfileRepository(self)
         self.manager = ManagerRepository(self)
 
+    async def run(self, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """
+        Call `fn` without blocking the event loop: inside the AsyncSession
+        greenlet when `session` is the sync facade of one, in the threadpool
+        otherwise. Calls are serialized, a session is not concurrency-safe.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.async_session is not None:
+                return await self.async_session.run_sync(lambda _: fn(*args, **kwargs))
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+    @property
+    def can_fork(self) -> bool:
+        """
+        Whether forks get a connection of their own, not so with the pools
+        handing every session the same one, as for in-memory SQLite
+        """
+        pool = self.session.get_bind().pool
+        return not isinstance(pool, (SingletonThreadPool, StaticPool))
+
+    def fork(self) -> "RepositoryManager":
+        """
+        Manager over a new session bound like this one, for work running
+        concurrently with it. Closed by `close_forks`.
+        """
+        info = dict(replica=self.session.info.get("replica", False))
+        if self.async_session is not None:
+            async_session = AsyncSession(
+                self.async_session.bind,
+                autoflush=False,
+                sync_session_class=Session,
+                info=info,
+            )
+            fork = RepositoryManager(async_session.sync_session, async_session)
+        else:
+            fork = RepositoryManager(
+                Session(self.session.bind, autoflush=False, info=info)
+            )
+        self.forks.append(fork)
+        return fork
+
+    async def close_forks(self) -> None:
+        forks, self.forks = self.forks, []
+        for fork in forks:
+            if fork.async_session is not None:
+                await fork.async_session.close()
+            else:
+                await run_in_threadpool(fork.session.close)
+
     def remove(self, instance: T) -> None:
         self.session.delete(instance)
         self.session.commit()
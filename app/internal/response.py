@@ -1,15 +1,96 @@
-from typing import Generic, List, TypeVar
+from enum import Enum
+from typing import Any, FrozenSet, Generic, List, Optional, Type, TypeVar
 
 from pydantic import BaseModel
 from pydantic.generics import GenericModel
 
 T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
 
 
 class CountResponse(BaseModel):
     count: int
 
 
+class BulkStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    failed = "failed"
+
+
+class BulkItemStatus(BaseModel):
+    """
+    Outcome of the item at `index` of a bulk request. `id` is only known for
+    items that gave one or matched an existing row: the ids of rows created
+    without one are not read back, it is None for them.
+    """
+
+    index: int
+    status: Optional[BulkStatus] = None
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    items: List[BulkItemStatus]
+
+    @classmethod
+    def from_statuses(cls, items: List[BulkItemStatus]) -> "BulkResponse":
+        counts = {status: 0 for status in BulkStatus}
+        for item in items:
+            counts[item.status] += 1
+        return cls(
+            created=counts[BulkStatus.created],
+            updated=counts[BulkStatus.updated],
+            failed=counts[BulkStatus.failed],
+            items=items,
+        )
+
+
+class Page(Generic[T]):
+    def __init__(
+        self,
+        items: List[T],
+        total: Optional[int],
+        next_cursor: Optional[str] = None,
+        prev_cursor: Optional[str] = None,
+    ) -> None:
+        self.items = items
+        self.total = total
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
 class PaginatedData(GenericModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    @classmethod
+    def from_page(
+        cls,
+        page: Page,
+        model: Type[BaseModel],
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> "PaginatedData":
+        return cls(
+            items=[project(model, item, fields) for item in page.items],
+            total=page.total,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+        )
+
+
+def project(model: Type[M], obj: Any, fields: Optional[FrozenSet[str]] = None) -> M:
+    """
+    Build `model` from an ORM instance, reading only `fields` when given so
+    that deferred columns and skipped relationships are never loaded. Fields
+    left out are unset, hence dropped by `response_model_exclude_unset`.
+    """
+    if fields is None:
+        return model.from_orm(obj)
+    return model.validate({name: getattr(obj, name) for name in fields})
@@ -0,0 +1,50 @@
+import asyncio
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute, _prepare_response_content
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from app.internal.repository_manager import RepositoryManager
+
+
+class SessionRoute(APIRoute):
+    """
+    Route running sync endpoints through the request's RepositoryManager.
+    The response model is built there too, so relationships it reads are
+    loaded off the event loop, whichever session backs the manager.
+    """
+
+    def get_route_handler(self) -> Callable:
+        if not asyncio.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = self._offload(self.dependant.call)
+        return super().get_route_handler()
+
+    def _offload(self, endpoint: Callable) -> Callable:
+        field = self.secure_cloned_response_field
+
+        def call(values: dict) -> Any:
+            content = endpoint(**values)
+            if field is None or isinstance(content, Response):
+                return content
+            content = _prepare_response_content(
+                content,
+                exclude_unset=self.response_model_exclude_unset,
+                exclude_defaults=self.response_model_exclude_defaults,
+                exclude_none=self.response_model_exclude_none,
+            )
+            value, errors = field.validate(content, {}, loc=("response",))
+            if errors:
+                raise ValidationError([errors], field.type_)
+            return value
+
+        @wraps(endpoint)
+        async def wrapper(**values: Any) -> Any:
+            for value in values.values():
+                if isinstance(value, RepositoryManager):
+                    return await value.run(call, values)
+            return await run_in_threadpool(call, values)
+
+        return wrapper
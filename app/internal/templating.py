@@ -0,0 +1,74 @@
+from functools import lru_cache
+from hashlib import sha1
+from typing import List
+
+from jinja2 import Environment, FileSystemBytecodeCache, TemplateError, nodes
+from jinja2.ext import Extension
+from loguru import logger
+from markupsafe import Markup
+from starlette.templating import Jinja2Templates
+
+from app.config import config
+from app.internal import cache
+
+bytecode_cache = FileSystemBytecodeCache(config.templates.bytecode_dir)
+environments: List[Environment] = []
+
+
+class FragmentCacheExtension(Extension):
+    """
+    `{% cache key, ... %}...{% endcache %}` keeps what the block renders
+    under its key when `templates.fragment_cache` is set. The key must
+    cover everything the block reads.
+    """
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render", [nodes.List(key)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, key: list, caller) -> str:
+        if not config.templates.fragment_cache:
+            return caller()
+        key = f"fragment:{sha1(repr(key).encode()).hexdigest()}"
+        value = cache.backend.get(key)
+        if value is not None:
+            return Markup(value.decode())
+        value = caller()
+        cache.backend.set(key, value.encode(), config.templates.fragment_ttl)
+        return value
+
+
+def configure(env: Environment) -> Environment:
+    """Share the bytecode cache and fragment caching with `env`"""
+    env.bytecode_cache = bytecode_cache
+    # in production templates only change with a deploy, don't stat them
+    env.auto_reload = config.env == "dev"
+    env.add_extension(FragmentCacheExtension)
+    environments.append(env)
+    return env
+
+
+def precompile() -> None:
+    """Compile every template now rather than on its first render"""
+    for env in environments:
+        for name in env.list_templates():
+            try:
+                env.get_template(name)
+            except TemplateError as e:
+                # left to fail when rendered, as it would have anyway
+                logger.warning(f"Can't precompile template {name}: {e}")
+
+
+@lru_cache()
+def templates_for(directory: str) -> Jinja2Templates:
+    """Process-wide Jinja2Templates of `directory`"""
+    templates = Jinja2Templates(directory)
+    configure(templates.env)
+    return templates
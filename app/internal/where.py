@@ -0,0 +1,94 @@
+import json
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+# past these, a filter is rejected rather than parsed
+MAX_DEPTH = 32
+MAX_PARAMS = 256
+
+
+class WhereSyntaxError(ValueError):
+    pass
+
+
+def parse_json(raw: str) -> Any:
+    """The `where=<json>` syntax"""
+    try:
+        value = json.loads(raw)
+    except (RecursionError, ValueError):
+        raise WhereSyntaxError("Invalid JSON")
+    _check_depth(value)
+    return value
+
+
+def parse_brackets(params: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    The `where[field][op]=value` syntax, with `where[or][0][...]` indexing
+    lists and a trailing `[]` appending to them. Unlike querystring_parser,
+    repeated or conflicting keys and gaps in indexes are errors.
+    """
+    root: Dict[str, Any] = dict()
+    for count, (key, value) in enumerate(params, 1):
+        if count > MAX_PARAMS:
+            raise WhereSyntaxError("Too many where parameters")
+        path = _path(key)
+        if path[-1] == "":
+            if len(path) == 1:
+                raise WhereSyntaxError(f"Invalid key {key!r}")
+            parent = _walk(root, path[:-2], key).setdefault(path[-2], [])
+            if not isinstance(parent, list):
+                raise WhereSyntaxError(f"Conflicting key {key!r}")
+            parent.append(value)
+            continue
+        node = _walk(root, path[:-1], key)
+        if path[-1] in node:
+            raise WhereSyntaxError(f"Repeated key {key!r}")
+        node[path[-1]] = value
+    return _lists(root)
+
+
+def _path(key: str) -> List[str]:
+    if not key.startswith("where[") or not key.endswith("]"):
+        raise WhereSyntaxError(f"Invalid key {key!r}")
+    path = key[6:-1].split("][")
+    if len(path) > MAX_DEPTH:
+        raise WhereSyntaxError("Filter too deep")
+    for i, segment in enumerate(path):
+        if "[" in segment or "]" in segment or (segment == "" and i < len(path) - 1):
+            raise WhereSyntaxError(f"Invalid key {key!r}")
+    return path
+
+
+def _walk(root: Dict[str, Any], path: List[str], key: str) -> Dict[str, Any]:
+    node = root
+    for segment in path:
+        node = node.setdefault(segment, dict())
+        if not isinstance(node, dict):
+            raise WhereSyntaxError(f"Conflicting key {key!r}")
+    return node
+
+
+def _lists(node: Any) -> Any:
+    # {"0": a, "1": b} -> [a, b], indexes must be 0..n-1
+    if isinstance(node, list):
+        return [_lists(value) for value in node]
+    if not isinstance(node, dict):
+        return node
+    if len(node) > 0 and all(key.isdigit() for key in node):
+        items = {int(key): value for key, value in node.items()}
+        if sorted(items) != list(range(len(node))):
+            raise WhereSyntaxError("List indexes must be 0, 1, 2...")
+        return [_lists(items[i]) for i in range(len(node))]
+    return {key: _lists(value) for key, value in node.items()}
+
+
+def _check_depth(value: Union[dict, list, Any]) -> None:
+    stack = [(value, 1)]
+    while stack:
+        value, depth = stack.pop()
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, list):
+            continue
+        if depth > MAX_DEPTH:
+            raise WhereSyntaxError("Filter too deep")
+        stack.extend((child, depth + 1) for child in value)
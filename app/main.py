@@ -16,8 +16,10 @@ from app.config import config
 from app.dependencies import get_templates
 from app.graphql.router import GraphQLRouter
 from app.internal.admin import admin
-from app.routers import (auth, author, author_profile, category, manager,
-                         movie, movie_preview, user)
+from app.internal.replica import ReplicaStickinessMiddleware
+from app.internal.templating import precompile
+from app.routers import (auth, author, author_profile, category, internal,
+                         manager, movie, movie_preview, user)
 from app.storage import configure_storage
 
 
@@ -39,6 +41,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(ReplicaStickinessMiddleware)
+    app.add_event_handler("startup", precompile)
     configure_storage()
     app.include_router(GraphQLRouter)
     app.include_router(movie.router)
@@ -49,6 +53,7 @@ def create_app() -> FastAPI:
     app.include_router(author_profile.router)
     app.include_router(manager.router)
     app.include_router(auth.router)
+    app.include_router(internal.router)
     app.add_api_route(
         "/admin/login",
         admin.render_login,
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
@@ -9,3 +11,26 @@ class LoginBody(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
+
+
+class Principal(BaseModel):
+    """The part of a User authorization reads, small enough to cache"""
+
+    id: int
+    roles: List[str] = []
+    is_superuser: bool = False
+
+    def has_permission(self, roles: List[str]) -> bool:
+        return has_permission(self.roles, self.is_superuser, roles)
+
+
+def has_permission(held: List[str], is_superuser: bool, roles: List[str]) -> bool:
+    """Whether holding `held` grants one of `roles`, any when `roles` is empty"""
+    if is_superuser or len(roles) == 0:
+        return True
+    if "IS_SUPERUSER" in roles:
+        return is_superuser
+    for role in roles:
+        if role in held:
+            return True
+    return False
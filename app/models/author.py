@@ -2,8 +2,8 @@ from datetime import date, datetime, time
 from typing import List, Optional
 
 from sqlalchemy import func
-from sqlmodel import (DATE, DATETIME, TIME, VARCHAR, Column, Enum, Field,
-                      Relationship, SQLModel)
+from sqlmodel import (DATE, DATETIME, INT, TIME, VARCHAR, Column, Enum,
+                      Field, Relationship, SQLModel)
 
 from app.internal.base_models import BaseSQLModel
 from app.models import enums
@@ -45,6 +45,33 @@ class Author(AuthorRelationFields, AuthorBase, BaseSQLModel, table=True):
     updated_at: Optional[datetime] = Field(
         None, sa_column=Column(DATETIME(timezone=True), onupdate=func.now())
     )
+    movies_count: int = Field(
+        0,
+        sa_column=Column(
+            INT,
+            nullable=False,
+            server_default="0",
+            info=dict(counts="movies_authors_link.author_id"),
+        ),
+    )
+    friends_count: int = Field(
+        0,
+        sa_column=Column(
+            INT,
+            nullable=False,
+            server_default="0",
+            info=dict(counts="friends_of_friends_link.author1_id"),
+        ),
+    )
+    friends_of_count: int = Field(
+        0,
+        sa_column=Column(
+            INT,
+            nullable=False,
+            server_default="0",
+            info=dict(counts="friends_of_friends_link.author2_id"),
+        ),
+    )
     manager: Optional["Manager"] = Relationship(
         sa_relationship_kwargs=dict(foreign_keys="Author.manager_id"),
         back_populates="authors",
@@ -86,6 +113,10 @@ class AuthorPatchBody(AuthorIn, metaclass=AllOptional):
     pass
 
 
+class AuthorBulkIn(AuthorIn):
+    id: Optional[int] = None
+
+
 class AuthorRelationsOut(SQLModel):
     manager: Optional["ManagerOutWithoutRelations"]
     profile: Optional["AuthorProfileOutWithoutRelations"]
@@ -97,6 +128,9 @@ class AuthorRelationsOut(SQLModel):
 class AuthorOutWithoutRelations(AuthorBase, BaseSQLModel):
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
+    movies_count: Optional[int]
+    friends_count: Optional[int]
+    friends_of_count: Optional[int]
 
 
 class AuthorOut(AuthorRelationsOut, AuthorOutWithoutRelations, metaclass=AllOptional):
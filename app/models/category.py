@@ -2,7 +2,7 @@ from typing import List, Optional
 
 from common.types import FileField, FileInfo
 from fastapi import File, Form, UploadFile
-from sqlmodel import TEXT, VARCHAR, Column, Field, Relationship, SQLModel
+from sqlmodel import INT, TEXT, VARCHAR, Column, Field, Relationship, SQLModel
 
 from app.internal.base_models import BaseSQLModel
 from app.utils import _AllOptionalMeta as AllOptional
@@ -22,6 +22,15 @@ class Category(CategoryRelationFields, CategoryBase, BaseSQLModel, table=True):
     image: Optional[FileInfo] = Field(
         None, sa_column=Column(FileField(upload_storage="default"))
     )
+    movies_count: int = Field(
+        0,
+        sa_column=Column(
+            INT,
+            nullable=False,
+            server_default="0",
+            info=dict(counts="movie.category_id"),
+        ),
+    )
     parent: Optional["Category"] = Relationship(
         sa_relationship_kwargs=dict(
             primaryjoin="remote(Category.id) == Category.parent_id"
@@ -77,6 +86,7 @@ class CategoryRelationsOut(SQLModel):
 
 class CategoryOutWithoutRelations(CategoryBase, BaseSQLModel):
     image: Optional[FileInfo]
+    movies_count: Optional[int]
 
 
 class CategoryOut(
@@ -85,6 +95,13 @@ class CategoryOut(
     pass
 
 
+class CategoryTree(SQLModel):
+    id: int
+    name: str
+    childs: List["CategoryTree"] = []
+
+
 from app.models.movie import Movie, MovieOutWithoutRelations
 
 CategoryOut.update_forward_refs()
+CategoryTree.update_forward_refs()
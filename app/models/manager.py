@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 
-from sqlmodel import VARCHAR, Column, Field, Relationship, SQLModel
+from sqlmodel import INT, VARCHAR, Column, Field, Relationship, SQLModel
 
 from app.internal.base_models import BaseSQLModel
 from app.utils import _AllOptionalMeta as AllOptional
@@ -21,6 +21,15 @@ class ManagerRelationFields(SQLModel):
 
 class Manager(ManagerRelationFields, ManagerBase, BaseSQLModel, table=True):
     __tablename__ = "manager"
+    authors_count: int = Field(
+        0,
+        sa_column=Column(
+            INT,
+            nullable=False,
+            server_default="0",
+            info=dict(counts="author.manager_id"),
+        ),
+    )
     authors: List["Author"] = Relationship(
         sa_relationship_kwargs=dict(foreign_keys="Author.manager_id"),
         back_populates="manager",
@@ -39,12 +48,16 @@ class ManagerPatchBody(ManagerIn, metaclass=AllOptional):
     pass
 
 
+class ManagerBulkIn(ManagerIn):
+    id: Optional[int] = None
+
+
 class ManagerRelationsOut(SQLModel):
     authors: List["AuthorOutWithoutRelations"]
 
 
 class ManagerOutWithoutRelations(ManagerBase, BaseSQLModel):
-    pass
+    authors_count: Optional[int]
 
 
 class ManagerOut(
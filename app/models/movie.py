@@ -35,6 +35,15 @@ class Movie(MovieRelationFields, MovieBase, BaseSQLModel, table=True):
     updated_at: Optional[datetime] = Field(
         None, sa_column=Column(DATETIME(timezone=True), onupdate=func.now())
     )
+    authors_count: int = Field(
+        0,
+        sa_column=Column(
+            INT,
+            nullable=False,
+            server_default="0",
+            info=dict(counts="movies_authors_link.movie_id"),
+        ),
+    )
     category: Optional["Category"] = Relationship(
         sa_relationship_kwargs=dict(foreign_keys="Movie.category_id"),
         back_populates="movies",
@@ -62,6 +71,10 @@ class MoviePatchBody(MovieIn, metaclass=AllOptional):
     pass
 
 
+class MovieBulkIn(MovieIn):
+    id: Optional[int] = None
+
+
 class MovieRelationsOut(SQLModel):
     preview: Optional["MoviePreviewOutWithoutRelations"]
     category: Optional["CategoryOutWithoutRelations"]
@@ -71,6 +84,7 @@ class MovieRelationsOut(SQLModel):
 class MovieOutWithoutRelations(MovieBase, BaseSQLModel):
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
+    authors_count: Optional[int]
 
 
 class MovieOut(MovieRelationsOut, MovieOutWithoutRelations, metaclass=AllOptional):
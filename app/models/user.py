@@ -8,6 +8,7 @@ from sqlalchemy import func
 from sqlmodel import DATETIME, JSON, VARCHAR, Column, Field, SQLModel
 
 from app.internal.base_models import BaseSQLModel
+from app.models.auth import has_permission
 from app.utils import _AllOptionalMeta as AllOptional
 
 
@@ -40,14 +41,7 @@ class User(UserRelationFields, UserBase, BaseSQLModel, table=True):
     is_superuser: Optional[bool] = Field(False)
 
     def has_permission(self, roles: List[str]) -> bool:
-        if self.is_superuser or len(roles) == 0:
-            return True
-        if "IS_SUPERUSER" in roles:
-            return self.is_superuser
-        for role in roles:
-            if role in self.roles:
-                return True
-        return False
+        return has_permission(self.roles or [], bool(self.is_superuser), roles)
 
 
 class UserInBase(UserBase):
@@ -1,16 +1,20 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, FrozenSet, List, Optional, Type, Union
+
+from pydantic import BaseModel
 
 from app.filters.author import AuthorFilter, AuthorOrderBy
 from app.internal.base_repository import BaseRepository
 from app.internal.filters import PaginationQuery
-from app.internal.response import CountResponse
-from app.models.author import Author, AuthorIn, AuthorPatchBody
+from app.internal.response import BulkResponse, CountResponse, Page
+from app.models.author import Author, AuthorBulkIn, AuthorIn, AuthorPatchBody
 
 if TYPE_CHECKING:
     from app.internal.repository_manager import RepositoryManager
 
 
 class AuthorRepository(BaseRepository[Author]):
+    natural_key = "profile_id"
+
     def __init__(self, rm: "RepositoryManager") -> None:
         super().__init__(Author, rm.session)
         self.rm = rm
@@ -21,8 +25,19 @@ class AuthorRepository(BaseRepository[Author]):
         where: Optional[AuthorFilter] = None,
         order_by: Optional[AuthorOrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
     ) -> Union[List[Author], int]:
-        return super().find_all(pagination, where, order_by, count)
+        return super().find_all(pagination, where, order_by, count, out)
+
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[AuthorFilter] = None,
+        order_by: Optional[AuthorOrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[Author]:
+        return super().paginate(pagination, where, order_by, out, fields)
 
     def find_one(self, where: Optional[AuthorFilter]) -> Optional[Author]:
         return super().find_one(where)
@@ -65,5 +80,8 @@ class AuthorRepository(BaseRepository[Author]):
         author.update(author_in.dict(exclude_unset=True))
         return self.save(author)
 
+    def bulk_create(self, items: List[AuthorBulkIn], upsert=False) -> BulkResponse:
+        return super().bulk_create(items, upsert)
+
     def delete(self, where: Optional[AuthorFilter]) -> CountResponse:
         return super().delete(where)
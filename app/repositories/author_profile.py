@@ -1,10 +1,12 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, FrozenSet, List, Optional, Type, Union
+
+from pydantic import BaseModel
 
 from app.filters.author_profile import (AuthorProfileFilter,
                                         AuthorProfileOrderBy)
 from app.internal.base_repository import BaseRepository
 from app.internal.filters import PaginationQuery
-from app.internal.response import CountResponse
+from app.internal.response import CountResponse, Page
 from app.models.author_profile import (AuthorProfile, AuthorProfileIn,
                                        AuthorProfilePatchBody)
 
@@ -23,8 +25,19 @@ class AuthorProfileRepository(BaseRepository[AuthorProfile]):
         where: Optional[AuthorProfileFilter] = None,
         order_by: Optional[AuthorProfileOrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
     ) -> Union[List[AuthorProfile], int]:
-        return super().find_all(pagination, where, order_by, count)
+        return super().find_all(pagination, where, order_by, count, out)
+
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[AuthorProfileFilter] = None,
+        order_by: Optional[AuthorProfileOrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[AuthorProfile]:
+        return super().paginate(pagination, where, order_by, out, fields)
 
     def find_one(self, where: Optional[AuthorProfileFilter]) -> Optional[AuthorProfile]:
         return super().find_one(where)
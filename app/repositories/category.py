@@ -1,10 +1,18 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+import json
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Type, Union
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import func, or_, select
+from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
 from app.filters.category import CategoryFilter, CategoryOrderBy
 from app.internal.base_repository import BaseRepository
+from app.internal.cache import query_cache
 from app.internal.filters import PaginationQuery
-from app.internal.response import CountResponse
-from app.models.category import Category, CategoryIn, CategoryPatchBody
+from app.internal.hierarchy import ancestor_ids, descendant_ids
+from app.internal.response import CountResponse, Page
+from app.models.category import Category, CategoryIn, CategoryPatchBody, CategoryTree
 
 if TYPE_CHECKING:
     from app.internal.repository_manager import RepositoryManager
@@ -21,8 +29,19 @@ class CategoryRepository(BaseRepository[Category]):
         where: Optional[CategoryFilter] = None,
         order_by: Optional[CategoryOrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
     ) -> Union[List[Category], int]:
-        return super().find_all(pagination, where, order_by, count)
+        return super().find_all(pagination, where, order_by, count, out)
+
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[CategoryFilter] = None,
+        order_by: Optional[CategoryOrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[Category]:
+        return super().paginate(pagination, where, order_by, out, fields)
 
     def find_one(self, where: Optional[CategoryFilter]) -> Optional[Category]:
         return super().find_one(where)
@@ -41,6 +60,7 @@ class CategoryRepository(BaseRepository[Category]):
             category_in.parent_id is None
             or self.rm.category.find_by_id(category_in.parent_id) is not None
         )
+        self.check_parent(id, [category_in.parent_id])
         category.update(category_in.dict())
         return self.save(category)
 
@@ -50,8 +70,58 @@ class CategoryRepository(BaseRepository[Category]):
             category_in.parent_id is None
             or self.rm.category.find_by_id(category_in.parent_id) is not None
         )
+        self.check_parent(id, [category_in.parent_id])
         category.update(category_in.dict(exclude_unset=True))
         return self.save(category)
 
     def delete(self, where: Optional[CategoryFilter]) -> CountResponse:
         return super().delete(where)
+
+    def check_parent(self, id: int, parent_ids: Iterable[Optional[int]]) -> None:
+        """Refuse to put `id` under itself or one of its descendants"""
+        parent_ids = [parent_id for parent_id in parent_ids if parent_id is not None]
+        subtree = or_(Category.id == id, Category.id.in_(descendant_ids(Category, id)))
+        self._check_cycle(parent_ids, subtree, "parent_id")
+
+    def check_childs(self, id: int, child_ids: Iterable[int]) -> None:
+        """Refuse to put `id` itself or one of its ancestors under `id`"""
+        path = or_(Category.id == id, Category.id.in_(ancestor_ids(Category, id)))
+        self._check_cycle(list(child_ids), path, "ids")
+
+    def _check_cycle(self, ids: List[int], forbidden, loc: str) -> None:
+        if len(ids) == 0:
+            return
+        stmt = select(func.count()).where(Category.id.in_(ids), forbidden)
+        if self.session.execute(stmt).scalar() > 0:
+            raise HTTPException(
+                HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=[{"loc": [loc], "msg": "categories can't form a cycle."}],
+            )
+
+    def tree(self, root: Optional[int] = None) -> List[CategoryTree]:
+        """
+        Categories nested under their parent, the whole forest or the
+        subtree of `root`, out of a single query
+        """
+        tables = {Category.__table__.name}
+        key = query_cache.key(tables, json.dumps(["tree", root]))
+        rows = query_cache.get(key)
+        if rows is None:
+            stmt = select(Category.id, Category.name, Category.parent_id)
+            if root is not None:
+                self.find_by_id(root)
+                stmt = stmt.where(CategoryFilter(subtree_of=root).to_query())
+            rows = [
+                tuple(row) for row in self.session.execute(stmt.order_by(Category.id))
+            ]
+            query_cache.set(self.session, tables, key, rows)
+        nodes: Dict[int, CategoryTree] = {
+            id: CategoryTree(id=id, name=name) for id, name, _ in rows
+        }
+        roots = []
+        for id, _, parent_id in rows:
+            if id != root and parent_id in nodes:
+                nodes[parent_id].childs.append(nodes[id])
+            else:
+                roots.append(nodes[id])
+        return roots
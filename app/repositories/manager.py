@@ -1,10 +1,12 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, FrozenSet, List, Optional, Type, Union
+
+from pydantic import BaseModel
 
 from app.filters.manager import ManagerFilter, ManagerOrderBy
 from app.internal.base_repository import BaseRepository
 from app.internal.filters import PaginationQuery
-from app.internal.response import CountResponse
-from app.models.manager import Manager, ManagerIn, ManagerPatchBody
+from app.internal.response import BulkResponse, CountResponse, Page
+from app.models.manager import Manager, ManagerBulkIn, ManagerIn, ManagerPatchBody
 
 if TYPE_CHECKING:
     from app.internal.repository_manager import RepositoryManager
@@ -21,8 +23,19 @@ class ManagerRepository(BaseRepository[Manager]):
         where: Optional[ManagerFilter] = None,
         order_by: Optional[ManagerOrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
     ) -> Union[List[Manager], int]:
-        return super().find_all(pagination, where, order_by, count)
+        return super().find_all(pagination, where, order_by, count, out)
+
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[ManagerFilter] = None,
+        order_by: Optional[ManagerOrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[Manager]:
+        return super().paginate(pagination, where, order_by, out, fields)
 
     def find_one(self, where: Optional[ManagerFilter]) -> Optional[Manager]:
         return super().find_one(where)
@@ -41,5 +54,8 @@ class ManagerRepository(BaseRepository[Manager]):
         manager.update(manager_in.dict(exclude_unset=True))
         return self.save(manager)
 
+    def bulk_create(self, items: List[ManagerBulkIn], upsert=False) -> BulkResponse:
+        return super().bulk_create(items, upsert)
+
     def delete(self, where: Optional[ManagerFilter]) -> CountResponse:
         return super().delete(where)
@@ -1,10 +1,12 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, FrozenSet, List, Optional, Type, Union
+
+from pydantic import BaseModel
 
 from app.filters.movie import MovieFilter, MovieOrderBy
 from app.internal.base_repository import BaseRepository
 from app.internal.filters import PaginationQuery
-from app.internal.response import CountResponse
-from app.models.movie import Movie, MovieIn, MoviePatchBody
+from app.internal.response import BulkResponse, CountResponse, Page
+from app.models.movie import Movie, MovieBulkIn, MovieIn, MoviePatchBody
 
 if TYPE_CHECKING:
     from app.internal.repository_manager import RepositoryManager
@@ -21,8 +23,19 @@ class MovieRepository(BaseRepository[Movie]):
         where: Optional[MovieFilter] = None,
         order_by: Optional[MovieOrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
     ) -> Union[List[Movie], int]:
-        return super().find_all(pagination, where, order_by, count)
+        return super().find_all(pagination, where, order_by, count, out)
+
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[MovieFilter] = None,
+        order_by: Optional[MovieOrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[Movie]:
+        return super().paginate(pagination, where, order_by, out, fields)
 
     def find_one(self, where: Optional[MovieFilter]) -> Optional[Movie]:
         return super().find_one(where)
@@ -53,5 +66,8 @@ class MovieRepository(BaseRepository[Movie]):
         movie.update(movie_in.dict(exclude_unset=True))
         return self.save(movie)
 
+    def bulk_create(self, items: List[MovieBulkIn], upsert=False) -> BulkResponse:
+        return super().bulk_create(items, upsert)
+
     def delete(self, where: Optional[MovieFilter]) -> CountResponse:
         return super().delete(where)
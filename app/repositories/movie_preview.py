@@ -1,9 +1,11 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, FrozenSet, List, Optional, Type, Union
+
+from pydantic import BaseModel
 
 from app.filters.movie_preview import MoviePreviewFilter, MoviePreviewOrderBy
 from app.internal.base_repository import BaseRepository
 from app.internal.filters import PaginationQuery
-from app.internal.response import CountResponse
+from app.internal.response import CountResponse, Page
 from app.models.movie_preview import (MoviePreview, MoviePreviewIn,
                                       MoviePreviewPatchBody)
 
@@ -22,8 +24,19 @@ class MoviePreviewRepository(BaseRepository[MoviePreview]):
         where: Optional[MoviePreviewFilter] = None,
         order_by: Optional[MoviePreviewOrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
     ) -> Union[List[MoviePreview], int]:
-        return super().find_all(pagination, where, order_by, count)
+        return super().find_all(pagination, where, order_by, count, out)
+
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[MoviePreviewFilter] = None,
+        order_by: Optional[MoviePreviewOrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[MoviePreview]:
+        return super().paginate(pagination, where, order_by, out, fields)
 
     def find_one(self, where: Optional[MoviePreviewFilter]) -> Optional[MoviePreview]:
         return super().find_one(where)
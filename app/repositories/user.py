@@ -1,16 +1,18 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, FrozenSet, List, Optional, Type, Union
 
 from fastapi import HTTPException
 from jose import JWTError, jwt
+from pydantic import BaseModel
 from starlette.status import (HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND,
                               HTTP_409_CONFLICT)
 
 from app.config import config
 from app.filters.user import UserFilter, UserOrderBy
 from app.internal.base_repository import BaseRepository
+from app.internal.cache import principal_cache
 from app.internal.filters import PaginationQuery
-from app.internal.response import CountResponse
-from app.models.auth import LoginBody, TokenResponse
+from app.internal.response import CountResponse, Page
+from app.models.auth import LoginBody, Principal, TokenResponse
 from app.models.user import User, UserIn, UserPatchBody, UserRegister
 from app.services.password import hash_password, verify_password
 from app.services.token import create_access_token, create_refresh_token
@@ -30,8 +32,19 @@ class UserRepository(BaseRepository[User]):
         where: Optional[UserFilter] = None,
         order_by: Optional[UserOrderBy] = None,
         count=False,
+        out: Optional[Type[BaseModel]] = None,
     ) -> Union[List[User], int]:
-        return super().find_all(pagination, where, order_by, count)
+        return super().find_all(pagination, where, order_by, count, out)
+
+    def paginate(
+        self,
+        pagination: PaginationQuery,
+        where: Optional[UserFilter] = None,
+        order_by: Optional[UserOrderBy] = None,
+        out: Optional[Type[BaseModel]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> Page[User]:
+        return super().paginate(pagination, where, order_by, out, fields)
 
     def find_one(self, where: Optional[UserFilter]) -> Optional[User]:
         return super().find_one(where)
@@ -45,11 +58,23 @@ class UserRepository(BaseRepository[User]):
             refresh_token=create_refresh_token(user.id),
         )
 
-    def load_from_token(self, token: str) -> User:
+    def load_from_token(self, token: str) -> Principal:
         payload = jwt.decode(token, config.jwt.secret, config.jwt.algorithm)
         if payload.get("type") != "access_token":
             raise JWTError("Invalid Token")
-        return self.find_by_id(payload.get("sub"))
+        id = int(payload.get("sub"))
+        principal = principal_cache.get(principal_cache.key(id))
+        return principal if principal is not None else self.find_principal(id)
+
+    def find_principal(self, id: int) -> Principal:
+        """Load the roles and superuser flag of user `id` into the cache"""
+        key = principal_cache.key(id)
+        user = self.find_by_id(id)
+        principal = Principal(
+            id=user.id, roles=user.roles or [], is_superuser=bool(user.is_superuser)
+        )
+        principal_cache.set(self.session, key, principal)
+        return principal
 
     def refresh_token(refresh_token: str) -> TokenResponse:
         try:
@@ -3,11 +3,12 @@ from starlette.status import HTTP_201_CREATED
 
 from app.dependencies import repository_manager
 from app.internal.repository_manager import RepositoryManager
-from app.models.auth import LoginBody, TokenResponse
+from app.internal.routing import SessionRoute
+from app.models.auth import LoginBody, Principal, TokenResponse
 from app.models.user import UserOut, UserRegister
 from app.services.auth import authorize
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=SessionRoute)
 
 
 @router.get(
@@ -17,8 +18,11 @@ router = APIRouter(prefix="/auth", tags=["auth"])
     status_code=HTTP_201_CREATED,
     summary="Get connected User info",
 )
-async def me(user=Depends(authorize())):
-    return user
+def me(
+    principal: Principal = Depends(authorize()),
+    repository: RepositoryManager = Depends(repository_manager),
+):
+    return repository.user.find_by_id(principal.id)
 
 
 @router.post(
@@ -28,21 +32,19 @@ async def me(user=Depends(authorize())):
     status_code=HTTP_201_CREATED,
     summary="Register new User",
 )
-async def register_new_user(
+def register_new_user(
     user_in: UserRegister, repository: RepositoryManager = Depends(repository_manager)
 ):
     return repository.user.create(user_in)
 
 
 @router.post("/login", name="auth:login", response_model=TokenResponse)
-async def login(
-    body: LoginBody, repository: RepositoryManager = Depends(repository_manager)
-):
+def login(body: LoginBody, repository: RepositoryManager = Depends(repository_manager)):
     return repository.user.login(body)
 
 
 @router.post("/refresh", name="auth:refresh_token", response_model=TokenResponse)
-async def refresh_token(
+def refresh_token(
     refresh_token: str, repository: RepositoryManager = Depends(repository_manager)
 ):
     return repository.user.refresh_token(refresh_token)
@@ -1,60 +1,82 @@
-from typing import List, Optional, Set
+from typing import List, Optional
 
 from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
                      Response)
-from pydantic import Json
 from starlette.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                               HTTP_404_NOT_FOUND)
 
 from app.dependencies import repository_manager
 from app.filters.author import AnyAuthorFilter, AuthorFilter, AuthorOrderBy
 from app.filters.movie import MovieFilter, MovieOrderBy
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, Projection
 from app.internal.repository_manager import RepositoryManager
-from app.internal.response import PaginatedData
-from app.models.author import (Author, AuthorIn, AuthorInBase, AuthorOut,
-                               AuthorOutWithoutRelations, AuthorPatchBody)
+from app.internal.response import BulkResponse, PaginatedData, project
+from app.internal.routing import SessionRoute
+from app.models.author import (Author, AuthorBulkIn, AuthorIn, AuthorInBase,
+                               AuthorOut, AuthorOutWithoutRelations,
+                               AuthorPatchBody)
 from app.models.author_profile import AuthorProfileOutWithoutRelations
 from app.models.manager import ManagerOutWithoutRelations
 from app.models.movie import Movie, MovieInBase, MovieOutWithoutRelations
 
-router = APIRouter(prefix="/api/authors", tags=["authors-controller"])
+router = APIRouter(
+    prefix="/api/authors", tags=["authors-controller"], route_class=SessionRoute
+)
 
 
 @router.get(
     "",
     name="authors:list",
     response_model=PaginatedData[AuthorOut],
+    response_model_exclude_unset=True,
     summary="Query all Author records",
 )
-async def list_all(
+def list_all(
     request: Request,
     response: Response,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: AuthorOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    total = repository.author.find_all(
-        pagination, AuthorFilter.from_query(request), order_by, True
-    )
-    items = repository.author.find_all(
-        pagination, AuthorFilter.from_query(request), order_by
+    fields = projection.names(AuthorOut)
+    where = AuthorFilter.from_query(request)
+    validators = repository.author.validators(
+        request.url, where, out=AuthorOut, fields=fields
     )
-    return PaginatedData(
-        items=[AuthorOut.from_orm(item) for item in items], total=total
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.author.paginate(
+        pagination, where, order_by, out=AuthorOut, fields=fields
     )
+    validators.apply(response)
+    return PaginatedData.from_page(page, AuthorOut, fields)
 
 
 @router.get(
-    "/{id}", name="authors:get", response_model=AuthorOut, summary="Get Author by id"
+    "/{id}",
+    name="authors:get",
+    response_model=AuthorOut,
+    response_model_exclude_unset=True,
+    summary="Get Author by id",
 )
-async def get_by_id(
+def get_by_id(
+    request: Request,
+    response: Response,
     id: int = Path(...),
-    exclude: Set[str] = Query({}),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    return repository.author.find_by_id(id)
+    fields = projection.names(AuthorOut)
+    validators = repository.author.validators(
+        request.url, id=id, out=AuthorOut, fields=fields
+    )
+    if validators.fresh(request):
+        return validators.not_modified()
+    author = repository.author.find_by_id(id, out=AuthorOut, fields=fields)
+    validators.apply(response)
+    return project(AuthorOut, author, fields)
 
 
 @router.post(
@@ -64,20 +86,34 @@ async def get_by_id(
     status_code=HTTP_201_CREATED,
     summary="Create new Author",
 )
-async def create_new(
+def create_new(
     author_in: AuthorIn,
     repository: RepositoryManager = Depends(repository_manager),
 ):
     return repository.author.create(author_in)
 
 
+@router.post(
+    "/bulk",
+    name="authors:bulk",
+    response_model=BulkResponse,
+    summary="Create or upsert many Author records",
+)
+def bulk_create(
+    authors_in: List[AuthorBulkIn],
+    upsert: bool = Query(False),
+    repository: RepositoryManager = Depends(repository_manager),
+):
+    return repository.author.bulk_create(authors_in, upsert)
+
+
 @router.put(
     "/{id}",
     name="authors:update",
     response_model=AuthorOut,
     summary="Update Author by id",
 )
-async def update(
+def update(
     author_in: AuthorIn,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -91,7 +127,7 @@ async def update(
     response_model=AuthorOut,
     summary="Partial Update Author by id",
 )
-async def patch_update(
+def patch_update(
     author_in: AuthorPatchBody,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -105,9 +141,9 @@ async def patch_update(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete Author by id",
 )
-async def delete_author(
+def delete_author(
     request: Request,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     repository.author.delete(AuthorFilter.from_query(request))
@@ -120,7 +156,7 @@ async def delete_author(
     response_model=ManagerOutWithoutRelations,
     summary="Get linked manager(Manager)",
 )
-async def get_manager(
+def get_manager(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -136,7 +172,7 @@ async def get_manager(
     response_model=ManagerOutWithoutRelations,
     summary="Linked with manager(Manager) by id",
 )
-async def link_manager(
+def link_manager(
     id: int = Path(...),
     manager_id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -152,7 +188,7 @@ async def link_manager(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete linked manager(Manager)",
 )
-async def delete_manager(
+def delete_manager(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -168,7 +204,7 @@ async def delete_manager(
     response_model=AuthorProfileOutWithoutRelations,
     summary="Get linked profile(AuthorProfile)",
 )
-async def get_profile(
+def get_profile(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -184,7 +220,7 @@ async def get_profile(
     response_model=AuthorProfileOutWithoutRelations,
     summary="Linked with profile(AuthorProfile) by id",
 )
-async def link_profile(
+def link_profile(
     id: int = Path(...),
     profile_id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -204,7 +240,7 @@ async def link_profile(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete linked profile(AuthorProfile)",
 )
-async def delete_profile(
+def delete_profile(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -220,10 +256,11 @@ async def delete_profile(
     response_model=PaginatedData[MovieOutWithoutRelations],
     summary="Get linked movies(Movie)",
 )
-async def get_movies(
+def get_movies(
     request: Request,
+    response: Response,
     id: int = Path(...),
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: MovieOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
@@ -232,11 +269,16 @@ async def get_movies(
     if where is None:
         where = MovieFilter()
     where.authors = AnyAuthorFilter(id=id)
-    total = repository.movie.find_all(pagination, where, order_by, count=True)
-    items = repository.movie.find_all(pagination, where, order_by)
-    return PaginatedData(
-        items=[MovieOutWithoutRelations.from_orm(item) for item in items], total=total
+    validators = repository.movie.validators(
+        request.url, where, out=MovieOutWithoutRelations
     )
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.movie.paginate(
+        pagination, where, order_by, out=MovieOutWithoutRelations
+    )
+    validators.apply(response)
+    return PaginatedData.from_page(page, MovieOutWithoutRelations)
 
 
 @router.post(
@@ -246,7 +288,7 @@ async def get_movies(
     status_code=HTTP_201_CREATED,
     summary="Add movies(Movie)",
 )
-async def add_movies(
+def add_movies(
     movie_in: MovieInBase,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -263,15 +305,16 @@ async def add_movies(
     response_model=List[MovieOutWithoutRelations],
     summary="Set movies(Movie) by ids",
 )
-async def set_existing_movies(
+def set_existing_movies(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     author = repository.author.find_by_id(id)
-    author.movies = repository.movie.find_by_ids(ids)
+    movies = repository.movie.find_by_ids(ids)
+    author.movies = movies
     repository.save(author)
-    return repository.movie.find_by_ids(ids)
+    return repository.movie.refresh_all(movies)
 
 
 @router.patch(
@@ -280,15 +323,16 @@ async def set_existing_movies(
     response_model=List[MovieOutWithoutRelations],
     summary="Add movies(Movie) by ids",
 )
-async def add_existing_movies(
+def add_existing_movies(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     author = repository.author.find_by_id(id)
-    author.movies.extend(repository.movie.find_by_ids(ids))
+    movies = repository.movie.find_by_ids(ids)
+    author.movies.extend(movies)
     repository.save(author)
-    return repository.movie.find_by_ids(ids)
+    return repository.movie.refresh_all(movies)
 
 
 @router.get(
@@ -297,10 +341,11 @@ async def add_existing_movies(
     response_model=PaginatedData[AuthorOutWithoutRelations],
     summary="Get linked friends(Author)",
 )
-async def get_friends(
+def get_friends(
     request: Request,
+    response: Response,
     id: int = Path(...),
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: AuthorOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
@@ -309,11 +354,16 @@ async def get_friends(
     if where is None:
         where = AuthorFilter()
     where.friends_of = AnyAuthorFilter(id=id)
-    total = repository.author.find_all(pagination, where, order_by, count=True)
-    items = repository.author.find_all(pagination, where, order_by)
-    return PaginatedData(
-        items=[AuthorOutWithoutRelations.from_orm(item) for item in items], total=total
+    validators = repository.author.validators(
+        request.url, where, out=AuthorOutWithoutRelations
+    )
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.author.paginate(
+        pagination, where, order_by, out=AuthorOutWithoutRelations
     )
+    validators.apply(response)
+    return PaginatedData.from_page(page, AuthorOutWithoutRelations)
 
 
 @router.post(
@@ -323,7 +373,7 @@ async def get_friends(
     status_code=HTTP_201_CREATED,
     summary="Add friends(Author)",
 )
-async def add_friends(
+def add_friends(
     author_in: AuthorInBase,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -340,15 +390,16 @@ async def add_friends(
     response_model=List[AuthorOutWithoutRelations],
     summary="Set friends(Author) by ids",
 )
-async def set_existing_friends(
+def set_existing_friends(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     author = repository.author.find_by_id(id)
-    author.friends = repository.author.find_by_ids(ids)
+    friends = repository.author.find_by_ids(ids)
+    author.friends = friends
     repository.save(author)
-    return repository.author.find_by_ids(ids)
+    return repository.author.refresh_all(friends)
 
 
 @router.patch(
@@ -357,15 +408,16 @@ async def set_existing_friends(
     response_model=List[AuthorOutWithoutRelations],
     summary="Add friends(Author) by ids",
 )
-async def add_existing_friends(
+def add_existing_friends(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     author = repository.author.find_by_id(id)
-    author.friends.extend(repository.author.find_by_ids(ids))
+    friends = repository.author.find_by_ids(ids)
+    author.friends.extend(friends)
     repository.save(author)
-    return repository.author.find_by_ids(ids)
+    return repository.author.refresh_all(friends)
 
 
 @router.get(
@@ -374,10 +426,11 @@ async def add_existing_friends(
     response_model=PaginatedData[AuthorOutWithoutRelations],
     summary="Get linked friends_of(Author)",
 )
-async def get_friends_of(
+def get_friends_of(
     request: Request,
+    response: Response,
     id: int = Path(...),
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: AuthorOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
@@ -386,11 +439,16 @@ async def get_friends_of(
     if where is None:
         where = AuthorFilter()
     where.friends = AnyAuthorFilter(id=id)
-    total = repository.author.find_all(pagination, where, order_by, count=True)
-    items = repository.author.find_all(pagination, where, order_by)
-    return PaginatedData(
-        items=[AuthorOutWithoutRelations.from_orm(item) for item in items], total=total
+    validators = repository.author.validators(
+        request.url, where, out=AuthorOutWithoutRelations
+    )
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.author.paginate(
+        pagination, where, order_by, out=AuthorOutWithoutRelations
     )
+    validators.apply(response)
+    return PaginatedData.from_page(page, AuthorOutWithoutRelations)
 
 
 @router.post(
@@ -400,7 +458,7 @@ async def get_friends_of(
     status_code=HTTP_201_CREATED,
     summary="Add friends_of(Author)",
 )
-async def add_friends_of(
+def add_friends_of(
     author_in: AuthorInBase,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -417,15 +475,16 @@ async def add_friends_of(
     response_model=List[AuthorOutWithoutRelations],
     summary="Set friends_of(Author) by ids",
 )
-async def set_existing_friends_of(
+def set_existing_friends_of(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     author = repository.author.find_by_id(id)
-    author.friends_of = repository.author.find_by_ids(ids)
+    friends_of = repository.author.find_by_ids(ids)
+    author.friends_of = friends_of
     repository.save(author)
-    return repository.author.find_by_ids(ids)
+    return repository.author.refresh_all(friends_of)
 
 
 @router.patch(
@@ -434,12 +493,13 @@ async def set_existing_friends_of(
     response_model=List[AuthorOutWithoutRelations],
     summary="Add friends_of(Author) by ids",
 )
-async def add_existing_friends_of(
+def add_existing_friends_of(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     author = repository.author.find_by_id(id)
-    author.friends_of.extend(repository.author.find_by_ids(ids))
+    friends_of = repository.author.find_by_ids(ids)
+    author.friends_of.extend(friends_of)
     repository.save(author)
-    return repository.author.find_by_ids(ids)
+    return repository.author.refresh_all(friends_of)
@@ -1,63 +1,74 @@
-from typing import Optional, Set
+from typing import Optional
 
 from common.types import FileInfo
 from fastapi import (APIRouter, Depends, File, HTTPException, Path, Query,
                      Request, Response, UploadFile)
-from pydantic import Json
 from starlette.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                               HTTP_404_NOT_FOUND)
 
 from app.dependencies import repository_manager
 from app.filters.author_profile import (AuthorProfileFilter,
                                         AuthorProfileOrderBy)
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, Projection
 from app.internal.repository_manager import RepositoryManager
-from app.internal.response import PaginatedData
+from app.internal.response import PaginatedData, project
+from app.internal.routing import SessionRoute
 from app.models.author import AuthorOutWithoutRelations
 from app.models.author_profile import (AuthorProfileIn, AuthorProfileOut,
                                        AuthorProfilePatchBody,
                                        author_profile_in_form)
 
-router = APIRouter(prefix="/api/author_profiles", tags=["author_profiles-controller"])
+router = APIRouter(
+    prefix="/api/author_profiles",
+    tags=["author_profiles-controller"],
+    route_class=SessionRoute,
+)
 
 
 @router.get(
     "",
     name="author_profiles:list",
     response_model=PaginatedData[AuthorProfileOut],
+    response_model_exclude_unset=True,
     summary="Query all AuthorProfile records",
 )
-async def list_all(
+def list_all(
     request: Request,
     response: Response,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: AuthorProfileOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    total = repository.author_profile.find_all(
-        pagination, AuthorProfileFilter.from_query(request), order_by, True
-    )
-    items = repository.author_profile.find_all(
-        pagination, AuthorProfileFilter.from_query(request), order_by
-    )
-    return PaginatedData(
-        items=[AuthorProfileOut.from_orm(item) for item in items], total=total
+    fields = projection.names(AuthorProfileOut)
+    page = repository.author_profile.paginate(
+        pagination,
+        AuthorProfileFilter.from_query(request),
+        order_by,
+        out=AuthorProfileOut,
+        fields=fields,
     )
+    return PaginatedData.from_page(page, AuthorProfileOut, fields)
 
 
 @router.get(
     "/{id}",
     name="author_profiles:get",
     response_model=AuthorProfileOut,
+    response_model_exclude_unset=True,
     summary="Get AuthorProfile by id",
 )
-async def get_by_id(
+def get_by_id(
     id: int = Path(...),
-    exclude: Set[str] = Query({}),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    return repository.author_profile.find_by_id(id)
+    fields = projection.names(AuthorProfileOut)
+    author_profile = repository.author_profile.find_by_id(
+        id, out=AuthorProfileOut, fields=fields
+    )
+    return project(AuthorProfileOut, author_profile, fields)
 
 
 @router.post(
@@ -67,7 +78,7 @@ async def get_by_id(
     status_code=HTTP_201_CREATED,
     summary="Create new AuthorProfile",
 )
-async def create_new(
+def create_new(
     author_profile_in: AuthorProfileIn = Depends(author_profile_in_form),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -80,7 +91,7 @@ async def create_new(
     response_model=AuthorProfileOut,
     summary="Update AuthorProfile by id",
 )
-async def update(
+def update(
     author_profile_in: AuthorProfileIn = Depends(author_profile_in_form),
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -94,7 +105,7 @@ async def update(
     response_model=AuthorProfileOut,
     summary="Partial Update AuthorProfile by id",
 )
-async def patch_update(
+def patch_update(
     author_profile_in: AuthorProfilePatchBody,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -108,7 +119,7 @@ async def patch_update(
     response_model=AuthorProfileOut,
     summary="Update AuthorProfile file by id",
 )
-async def update_file(
+def update_file(
     file: UploadFile = File(...),
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -124,7 +135,7 @@ async def update_file(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete AuthorProfile file",
 )
-async def delete_file(
+def delete_file(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -140,9 +151,9 @@ async def delete_file(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete AuthorProfile by id",
 )
-async def delete_author_profile(
+def delete_author_profile(
     request: Request,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     repository.author_profile.delete(AuthorProfileFilter.from_query(request))
@@ -155,7 +166,7 @@ async def delete_author_profile(
     response_model=AuthorOutWithoutRelations,
     summary="Get linked author(Author)",
 )
-async def get_author(
+def get_author(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -171,7 +182,7 @@ async def get_author(
     response_model=AuthorOutWithoutRelations,
     summary="Linked with author(Author) by id",
 )
-async def link_author(
+def link_author(
     id: int = Path(...),
     author_id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -191,7 +202,7 @@ async def link_author(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete linked author(Author)",
 )
-async def delete_author(
+def delete_author(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -1,9 +1,8 @@
-from typing import List, Optional, Set
+from typing import List, Optional
 
 from common.types import FileInfo
 from fastapi import (APIRouter, Depends, File, HTTPException, Path, Query,
                      Request, Response, UploadFile)
-from pydantic import Json
 from starlette.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                               HTTP_404_NOT_FOUND)
 
@@ -11,54 +10,76 @@ from app.dependencies import repository_manager
 from app.filters.category import (CategoryFilter, CategoryOrderBy,
                                   HasCategoryFilter)
 from app.filters.movie import MovieFilter, MovieOrderBy
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, Projection
 from app.internal.repository_manager import RepositoryManager
-from app.internal.response import PaginatedData
+from app.internal.response import PaginatedData, project
+from app.internal.routing import SessionRoute
 from app.models.category import (Category, CategoryIn, CategoryInBase,
                                  CategoryOut, CategoryOutWithoutRelations,
-                                 CategoryPatchBody, category_in_form)
+                                 CategoryPatchBody, CategoryTree,
+                                 category_in_form)
 from app.models.movie import Movie, MovieInBase, MovieOutWithoutRelations
 
-router = APIRouter(prefix="/api/categories", tags=["categories-controller"])
+router = APIRouter(
+    prefix="/api/categories", tags=["categories-controller"], route_class=SessionRoute
+)
 
 
 @router.get(
     "",
     name="categories:list",
     response_model=PaginatedData[CategoryOut],
+    response_model_exclude_unset=True,
     summary="Query all Category records",
 )
-async def list_all(
+def list_all(
     request: Request,
     response: Response,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: CategoryOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    total = repository.category.find_all(
-        pagination, CategoryFilter.from_query(request), order_by, True
-    )
-    items = repository.category.find_all(
-        pagination, CategoryFilter.from_query(request), order_by
-    )
-    return PaginatedData(
-        items=[CategoryOut.from_orm(item) for item in items], total=total
+    fields = projection.names(CategoryOut)
+    page = repository.category.paginate(
+        pagination,
+        CategoryFilter.from_query(request),
+        order_by,
+        out=CategoryOut,
+        fields=fields,
     )
+    return PaginatedData.from_page(page, CategoryOut, fields)
+
+
+@router.get(
+    "/tree",
+    name="categories:tree",
+    response_model=List[CategoryTree],
+    summary="Get the Category hierarchy",
+)
+def get_tree(
+    root: Optional[int] = Query(None),
+    repository: RepositoryManager = Depends(repository_manager),
+):
+    return repository.category.tree(root)
 
 
 @router.get(
     "/{id}",
     name="categories:get",
     response_model=CategoryOut,
+    response_model_exclude_unset=True,
     summary="Get Category by id",
 )
-async def get_by_id(
+def get_by_id(
     id: int = Path(...),
-    exclude: Set[str] = Query({}),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    return repository.category.find_by_id(id)
+    fields = projection.names(CategoryOut)
+    category = repository.category.find_by_id(id, out=CategoryOut, fields=fields)
+    return project(CategoryOut, category, fields)
 
 
 @router.post(
@@ -68,7 +89,7 @@ async def get_by_id(
     status_code=HTTP_201_CREATED,
     summary="Create new Category",
 )
-async def create_new(
+def create_new(
     category_in: CategoryIn = Depends(category_in_form),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -81,7 +102,7 @@ async def create_new(
     response_model=CategoryOut,
     summary="Update Category by id",
 )
-async def update(
+def update(
     category_in: CategoryIn = Depends(category_in_form),
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -95,7 +116,7 @@ async def update(
     response_model=CategoryOut,
     summary="Partial Update Category by id",
 )
-async def patch_update(
+def patch_update(
     category_in: CategoryPatchBody,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -109,7 +130,7 @@ async def patch_update(
     response_model=CategoryOut,
     summary="Update Category image by id",
 )
-async def update_image(
+def update_image(
     image: Optional[UploadFile] = File(None),
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -125,7 +146,7 @@ async def update_image(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete Category image",
 )
-async def delete_image(
+def delete_image(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -141,9 +162,9 @@ async def delete_image(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete Category by id",
 )
-async def delete_category(
+def delete_category(
     request: Request,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     repository.category.delete(CategoryFilter.from_query(request))
@@ -156,7 +177,7 @@ async def delete_category(
     response_model=CategoryOutWithoutRelations,
     summary="Get linked parent(Category)",
 )
-async def get_parent(
+def get_parent(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -172,12 +193,13 @@ async def get_parent(
     response_model=CategoryOutWithoutRelations,
     summary="Linked with parent(Category) by id",
 )
-async def link_parent(
+def link_parent(
     id: int = Path(...),
     parent_id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     category = repository.category.find_by_id(id)
+    repository.category.check_parent(id, [parent_id])
     category.parent_id = repository.category.find_by_id(parent_id).id
     return repository.save(category).parent
 
@@ -188,7 +210,7 @@ async def link_parent(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete linked parent(Category)",
 )
-async def delete_parent(
+def delete_parent(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -204,10 +226,11 @@ async def delete_parent(
     response_model=PaginatedData[MovieOutWithoutRelations],
     summary="Get linked movies(Movie)",
 )
-async def get_movies(
+def get_movies(
     request: Request,
+    response: Response,
     id: int = Path(...),
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: MovieOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
@@ -216,11 +239,16 @@ async def get_movies(
     if where is None:
         where = MovieFilter()
     where.category = HasCategoryFilter(id=id)
-    total = repository.movie.find_all(pagination, where, order_by, count=True)
-    items = repository.movie.find_all(pagination, where, order_by)
-    return PaginatedData(
-        items=[MovieOutWithoutRelations.from_orm(item) for item in items], total=total
+    validators = repository.movie.validators(
+        request.url, where, out=MovieOutWithoutRelations
     )
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.movie.paginate(
+        pagination, where, order_by, out=MovieOutWithoutRelations
+    )
+    validators.apply(response)
+    return PaginatedData.from_page(page, MovieOutWithoutRelations)
 
 
 @router.post(
@@ -230,7 +258,7 @@ async def get_movies(
     status_code=HTTP_201_CREATED,
     summary="Add movies(Movie)",
 )
-async def add_movies(
+def add_movies(
     movie_in: MovieInBase,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -247,15 +275,16 @@ async def add_movies(
     response_model=List[MovieOutWithoutRelations],
     summary="Set movies(Movie) by ids",
 )
-async def set_existing_movies(
+def set_existing_movies(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     category = repository.category.find_by_id(id)
-    category.movies = repository.movie.find_by_ids(ids)
+    movies = repository.movie.find_by_ids(ids)
+    category.movies = movies
     repository.save(category)
-    return repository.movie.find_by_ids(ids)
+    return repository.movie.refresh_all(movies)
 
 
 @router.get(
@@ -264,10 +293,11 @@ async def set_existing_movies(
     response_model=PaginatedData[CategoryOutWithoutRelations],
     summary="Get linked childs(Category)",
 )
-async def get_childs(
+def get_childs(
     request: Request,
+    response: Response,
     id: int = Path(...),
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: CategoryOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
@@ -276,12 +306,16 @@ async def get_childs(
     if where is None:
         where = CategoryFilter()
     where.parent = HasCategoryFilter(id=id)
-    total = repository.category.find_all(pagination, where, order_by, count=True)
-    items = repository.category.find_all(pagination, where, order_by)
-    return PaginatedData(
-        items=[CategoryOutWithoutRelations.from_orm(item) for item in items],
-        total=total,
+    validators = repository.category.validators(
+        request.url, where, out=CategoryOutWithoutRelations
+    )
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.category.paginate(
+        pagination, where, order_by, out=CategoryOutWithoutRelations
     )
+    validators.apply(response)
+    return PaginatedData.from_page(page, CategoryOutWithoutRelations)
 
 
 @router.post(
@@ -291,7 +325,7 @@ async def get_childs(
     status_code=HTTP_201_CREATED,
     summary="Add childs(Category)",
 )
-async def add_childs(
+def add_childs(
     category_in: CategoryInBase,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -308,12 +342,14 @@ async def add_childs(
     response_model=List[CategoryOutWithoutRelations],
     summary="Set childs(Category) by ids",
 )
-async def set_existing_childs(
+def set_existing_childs(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     category = repository.category.find_by_id(id)
-    category.childs = repository.category.find_by_ids(ids)
+    childs = repository.category.find_by_ids(ids)
+    repository.category.check_childs(id, ids)
+    category.childs = childs
     repository.save(category)
-    return repository.category.find_by_ids(ids)
+    return repository.category.refresh_all(childs)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+
+from app.dependencies import repository_manager
+from app.graphql.schema import graphql_app
+from app.graphql.timing import field_timings
+from app.internal.cache import entity_cache, principal_cache, query_cache
+from app.internal.compiled_cache import compiled_cache_stats
+from app.internal.counters import reconcile
+from app.internal.filters import where_cache_stats
+from app.internal.pool import pool_stats
+from app.internal.repository_manager import RepositoryManager
+from app.models.auth import Principal
+from app.services.auth import authorize
+
+router = APIRouter(prefix="/internal", tags=["internal"], include_in_schema=False)
+
+
+@router.get("/db/pool", name="internal:db:pool")
+async def db_pool(user: Principal = Depends(authorize(["IS_SUPERUSER"]))):
+    return pool_stats()
+
+
+@router.get("/cache", name="internal:cache")
+async def cache(user: Principal = Depends(authorize(["IS_SUPERUSER"]))):
+    return dict(
+        entity=entity_cache.stats(),
+        query=query_cache.stats(),
+        compiled=compiled_cache_stats(),
+        where=where_cache_stats(),
+        principal=principal_cache.stats(),
+        graphql_documents=graphql_app.documents.stats(),
+    )
+
+
+@router.get("/graphql/timings", name="internal:graphql:timings")
+async def graphql_timings(user: Principal = Depends(authorize(["IS_SUPERUSER"]))):
+    return field_timings.stats()
+
+
+@router.post("/counters/reconcile", name="internal:counters:reconcile")
+async def reconcile_counters(
+    user: Principal = Depends(authorize(["IS_SUPERUSER"])),
+    repository: RepositoryManager = Depends(repository_manager),
+):
+    """Recount the relation counters that drifted, by counter"""
+    return await repository.run(reconcile, repository.session)
@@ -1,55 +1,65 @@
-from typing import List, Optional, Set
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Path, Query, Request, Response
-from pydantic import Json
 from starlette.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT
 
 from app.dependencies import repository_manager
 from app.filters.author import AuthorFilter, AuthorOrderBy
 from app.filters.manager import HasManagerFilter, ManagerFilter, ManagerOrderBy
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, Projection
 from app.internal.repository_manager import RepositoryManager
-from app.internal.response import PaginatedData
+from app.internal.response import BulkResponse, PaginatedData, project
+from app.internal.routing import SessionRoute
 from app.models.author import Author, AuthorInBase, AuthorOutWithoutRelations
-from app.models.manager import ManagerIn, ManagerOut, ManagerPatchBody
+from app.models.manager import ManagerBulkIn, ManagerIn, ManagerOut, ManagerPatchBody
 
-router = APIRouter(prefix="/api/managers", tags=["managers-controller"])
+router = APIRouter(
+    prefix="/api/managers", tags=["managers-controller"], route_class=SessionRoute
+)
 
 
 @router.get(
     "",
     name="managers:list",
     response_model=PaginatedData[ManagerOut],
+    response_model_exclude_unset=True,
     summary="Query all Manager records",
 )
-async def list_all(
+def list_all(
     request: Request,
     response: Response,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: ManagerOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    total = repository.manager.find_all(
-        pagination, ManagerFilter.from_query(request), order_by, True
-    )
-    items = repository.manager.find_all(
-        pagination, ManagerFilter.from_query(request), order_by
-    )
-    return PaginatedData(
-        items=[ManagerOut.from_orm(item) for item in items], total=total
+    fields = projection.names(ManagerOut)
+    page = repository.manager.paginate(
+        pagination,
+        ManagerFilter.from_query(request),
+        order_by,
+        out=ManagerOut,
+        fields=fields,
     )
+    return PaginatedData.from_page(page, ManagerOut, fields)
 
 
 @router.get(
-    "/{id}", name="managers:get", response_model=ManagerOut, summary="Get Manager by id"
+    "/{id}",
+    name="managers:get",
+    response_model=ManagerOut,
+    response_model_exclude_unset=True,
+    summary="Get Manager by id",
 )
-async def get_by_id(
+def get_by_id(
     id: int = Path(...),
-    exclude: Set[str] = Query({}),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    return repository.manager.find_by_id(id)
+    fields = projection.names(ManagerOut)
+    manager = repository.manager.find_by_id(id, out=ManagerOut, fields=fields)
+    return project(ManagerOut, manager, fields)
 
 
 @router.post(
@@ -59,20 +69,34 @@ async def get_by_id(
     status_code=HTTP_201_CREATED,
     summary="Create new Manager",
 )
-async def create_new(
+def create_new(
     manager_in: ManagerIn,
     repository: RepositoryManager = Depends(repository_manager),
 ):
     return repository.manager.create(manager_in)
 
 
+@router.post(
+    "/bulk",
+    name="managers:bulk",
+    response_model=BulkResponse,
+    summary="Create or upsert many Manager records",
+)
+def bulk_create(
+    managers_in: List[ManagerBulkIn],
+    upsert: bool = Query(False),
+    repository: RepositoryManager = Depends(repository_manager),
+):
+    return repository.manager.bulk_create(managers_in, upsert)
+
+
 @router.put(
     "/{id}",
     name="managers:update",
     response_model=ManagerOut,
     summary="Update Manager by id",
 )
-async def update(
+def update(
     manager_in: ManagerIn,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -86,7 +110,7 @@ async def update(
     response_model=ManagerOut,
     summary="Partial Update Manager by id",
 )
-async def patch_update(
+def patch_update(
     manager_in: ManagerPatchBody,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -100,9 +124,9 @@ async def patch_update(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete Manager by id",
 )
-async def delete_manager(
+def delete_manager(
     request: Request,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     repository.manager.delete(ManagerFilter.from_query(request))
@@ -115,10 +139,11 @@ async def delete_manager(
     response_model=PaginatedData[AuthorOutWithoutRelations],
     summary="Get linked authors(Author)",
 )
-async def get_authors(
+def get_authors(
     request: Request,
+    response: Response,
     id: int = Path(...),
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: AuthorOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
@@ -127,11 +152,16 @@ async def get_authors(
     if where is None:
         where = AuthorFilter()
     where.manager = HasManagerFilter(id=id)
-    total = repository.author.find_all(pagination, where, order_by, count=True)
-    items = repository.author.find_all(pagination, where, order_by)
-    return PaginatedData(
-        items=[AuthorOutWithoutRelations.from_orm(item) for item in items], total=total
+    validators = repository.author.validators(
+        request.url, where, out=AuthorOutWithoutRelations
+    )
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.author.paginate(
+        pagination, where, order_by, out=AuthorOutWithoutRelations
     )
+    validators.apply(response)
+    return PaginatedData.from_page(page, AuthorOutWithoutRelations)
 
 
 @router.post(
@@ -141,7 +171,7 @@ async def get_authors(
     status_code=HTTP_201_CREATED,
     summary="Add authors(Author)",
 )
-async def add_authors(
+def add_authors(
     author_in: AuthorInBase,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -158,12 +188,13 @@ async def add_authors(
     response_model=List[AuthorOutWithoutRelations],
     summary="Set authors(Author) by ids",
 )
-async def set_existing_authors(
+def set_existing_authors(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     manager = repository.manager.find_by_id(id)
-    manager.authors = repository.author.find_by_ids(ids)
+    authors = repository.author.find_by_ids(ids)
+    manager.authors = authors
     repository.save(manager)
-    return repository.author.find_by_ids(ids)
+    return repository.author.refresh_all(authors)
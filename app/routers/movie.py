@@ -1,59 +1,82 @@
-from typing import List, Optional, Set
+from typing import List, Optional
 
 from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
                      Response)
-from pydantic import Json
 from starlette.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                               HTTP_404_NOT_FOUND)
 
 from app.dependencies import repository_manager
 from app.filters.author import AuthorFilter, AuthorOrderBy
 from app.filters.movie import AnyMovieFilter, MovieFilter, MovieOrderBy
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, Projection
 from app.internal.repository_manager import RepositoryManager
-from app.internal.response import PaginatedData
+from app.internal.response import BulkResponse, PaginatedData, project
+from app.internal.routing import SessionRoute
+from app.models.auth import Principal
 from app.models.author import Author, AuthorInBase, AuthorOutWithoutRelations
 from app.models.category import CategoryOutWithoutRelations
-from app.models.movie import MovieIn, MovieOut, MoviePatchBody
+from app.models.movie import MovieBulkIn, MovieIn, MovieOut, MoviePatchBody
 from app.models.movie_preview import MoviePreviewOutWithoutRelations
-from app.models.user import User
 from app.services.auth import authorize
 
-router = APIRouter(prefix="/api/movies", tags=["movies-controller"])
+router = APIRouter(
+    prefix="/api/movies", tags=["movies-controller"], route_class=SessionRoute
+)
 
 
 @router.get(
     "",
     name="movies:list",
     response_model=PaginatedData[MovieOut],
+    response_model_exclude_unset=True,
     summary="Query all Movie records",
 )
-async def list_all(
+def list_all(
     request: Request,
     response: Response,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: MovieOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    total = repository.movie.find_all(
-        pagination, MovieFilter.from_query(request), order_by, True
+    fields = projection.names(MovieOut)
+    where = MovieFilter.from_query(request)
+    validators = repository.movie.validators(
+        request.url, where, out=MovieOut, fields=fields
     )
-    items = repository.movie.find_all(
-        pagination, MovieFilter.from_query(request), order_by
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.movie.paginate(
+        pagination, where, order_by, out=MovieOut, fields=fields
     )
-    return PaginatedData(items=[MovieOut.from_orm(item) for item in items], total=total)
+    validators.apply(response)
+    return PaginatedData.from_page(page, MovieOut, fields)
 
 
 @router.get(
-    "/{id}", name="movies:get", response_model=MovieOut, summary="Get Movie by id"
+    "/{id}",
+    name="movies:get",
+    response_model=MovieOut,
+    response_model_exclude_unset=True,
+    summary="Get Movie by id",
 )
-async def get_by_id(
+def get_by_id(
+    request: Request,
+    response: Response,
     id: int = Path(...),
-    exclude: Set[str] = Query({}),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    return repository.movie.find_by_id(id)
+    fields = projection.names(MovieOut)
+    validators = repository.movie.validators(
+        request.url, id=id, out=MovieOut, fields=fields
+    )
+    if validators.fresh(request):
+        return validators.not_modified()
+    movie = repository.movie.find_by_id(id, out=MovieOut, fields=fields)
+    validators.apply(response)
+    return project(MovieOut, movie, fields)
 
 
 @router.post(
@@ -63,21 +86,36 @@ async def get_by_id(
     status_code=HTTP_201_CREATED,
     summary="Create new Movie",
 )
-async def create_new(
+def create_new(
     movie_in: MovieIn,
     repository: RepositoryManager = Depends(repository_manager),
 ):
     return repository.movie.create(movie_in)
 
 
+@router.post(
+    "/bulk",
+    name="movies:bulk",
+    response_model=BulkResponse,
+    summary="Create or upsert many Movie records",
+)
+def bulk_create(
+    movies_in: List[MovieBulkIn],
+    upsert: bool = Query(False),
+    repository: RepositoryManager = Depends(repository_manager),
+    user: Principal = Depends(authorize(["movie:edit"])),
+):
+    return repository.movie.bulk_create(movies_in, upsert)
+
+
 @router.put(
     "/{id}", name="movies:update", response_model=MovieOut, summary="Update Movie by id"
 )
-async def update(
+def update(
     movie_in: MovieIn,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     return repository.movie.update(id, movie_in)
 
@@ -88,11 +126,11 @@ async def update(
     response_model=MovieOut,
     summary="Partial Update Movie by id",
 )
-async def patch_update(
+def patch_update(
     movie_in: MoviePatchBody,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     return repository.movie.patch(id, movie_in)
 
@@ -103,11 +141,11 @@ async def patch_update(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete Movie by id",
 )
-async def delete_movie(
+def delete_movie(
     request: Request,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:delete"])),
+    user: Principal = Depends(authorize(["movie:delete"])),
 ):
     repository.movie.delete(MovieFilter.from_query(request))
     return Response(status_code=HTTP_204_NO_CONTENT)
@@ -119,7 +157,7 @@ async def delete_movie(
     response_model=MoviePreviewOutWithoutRelations,
     summary="Get linked preview(MoviePreview)",
 )
-async def get_preview(
+def get_preview(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -135,11 +173,11 @@ async def get_preview(
     response_model=MoviePreviewOutWithoutRelations,
     summary="Linked with preview(MoviePreview) by id",
 )
-async def link_preview(
+def link_preview(
     id: int = Path(...),
     preview_id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     movie = repository.movie.find_by_id(id)
     preview = repository.movie_preview.find_by_id(preview_id)
@@ -156,10 +194,10 @@ async def link_preview(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete linked preview(MoviePreview)",
 )
-async def delete_preview(
+def delete_preview(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     movie = repository.movie.find_by_id(id)
     movie.preview = None
@@ -173,7 +211,7 @@ async def delete_preview(
     response_model=CategoryOutWithoutRelations,
     summary="Get linked category(Category)",
 )
-async def get_category(
+def get_category(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -189,11 +227,11 @@ async def get_category(
     response_model=CategoryOutWithoutRelations,
     summary="Linked with category(Category) by id",
 )
-async def link_category(
+def link_category(
     id: int = Path(...),
     category_id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     movie = repository.movie.find_by_id(id)
     movie.category_id = repository.category.find_by_id(category_id).id
@@ -206,10 +244,10 @@ async def link_category(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete linked category(Category)",
 )
-async def delete_category(
+def delete_category(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     movie = repository.movie.find_by_id(id)
     movie.category = None
@@ -223,10 +261,11 @@ async def delete_category(
     response_model=PaginatedData[AuthorOutWithoutRelations],
     summary="Get linked authors(Author)",
 )
-async def get_authors(
+def get_authors(
     request: Request,
+    response: Response,
     id: int = Path(...),
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: AuthorOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
@@ -235,11 +274,16 @@ async def get_authors(
     if where is None:
         where = AuthorFilter()
     where.movies = AnyMovieFilter(id=id)
-    total = repository.author.find_all(pagination, where, order_by, count=True)
-    items = repository.author.find_all(pagination, where, order_by)
-    return PaginatedData(
-        items=[AuthorOutWithoutRelations.from_orm(item) for item in items], total=total
+    validators = repository.author.validators(
+        request.url, where, out=AuthorOutWithoutRelations
+    )
+    if validators.fresh(request):
+        return validators.not_modified()
+    page = repository.author.paginate(
+        pagination, where, order_by, out=AuthorOutWithoutRelations
     )
+    validators.apply(response)
+    return PaginatedData.from_page(page, AuthorOutWithoutRelations)
 
 
 @router.post(
@@ -249,7 +293,7 @@ async def get_authors(
     status_code=HTTP_201_CREATED,
     summary="Add authors(Author)",
 )
-async def add_authors(
+def add_authors(
     author_in: AuthorInBase,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -266,16 +310,17 @@ async def add_authors(
     response_model=List[AuthorOutWithoutRelations],
     summary="Set authors(Author) by ids",
 )
-async def set_existing_authors(
+def set_existing_authors(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     movie = repository.movie.find_by_id(id)
-    movie.authors = repository.author.find_by_ids(ids)
+    authors = repository.author.find_by_ids(ids)
+    movie.authors = authors
     repository.save(movie)
-    return repository.author.find_by_ids(ids)
+    return repository.author.refresh_all(authors)
 
 
 @router.patch(
@@ -284,13 +329,14 @@ async def set_existing_authors(
     response_model=List[AuthorOutWithoutRelations],
     summary="Add authors(Author) by ids",
 )
-async def add_existing_authors(
+def add_existing_authors(
     ids: List[int],
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie:edit"])),
+    user: Principal = Depends(authorize(["movie:edit"])),
 ):
     movie = repository.movie.find_by_id(id)
-    movie.authors.extend(repository.author.find_by_ids(ids))
+    authors = repository.author.find_by_ids(ids)
+    movie.authors.extend(authors)
     repository.save(movie)
-    return repository.author.find_by_ids(ids)
+    return repository.author.refresh_all(authors)
@@ -1,64 +1,75 @@
-from typing import List, Optional, Set
+from typing import List, Optional
 
 from common.types import FileInfo
 from fastapi import (APIRouter, Depends, File, HTTPException, Path, Query,
                      Request, Response, UploadFile)
-from pydantic import Json
 from starlette.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                               HTTP_404_NOT_FOUND)
 
 from app.dependencies import repository_manager
 from app.filters.movie_preview import MoviePreviewFilter, MoviePreviewOrderBy
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, Projection
 from app.internal.repository_manager import RepositoryManager
-from app.internal.response import PaginatedData
+from app.internal.response import PaginatedData, project
+from app.internal.routing import SessionRoute
+from app.models.auth import Principal
 from app.models.movie import MovieOutWithoutRelations
 from app.models.movie_preview import (MoviePreviewIn, MoviePreviewOut,
                                       MoviePreviewPatchBody,
                                       movie_preview_in_form)
-from app.models.user import User
 from app.services.auth import authorize
 
-router = APIRouter(prefix="/api/movie_previews", tags=["movie_previews-controller"])
+router = APIRouter(
+    prefix="/api/movie_previews",
+    tags=["movie_previews-controller"],
+    route_class=SessionRoute,
+)
 
 
 @router.get(
     "",
     name="movie_previews:list",
     response_model=PaginatedData[MoviePreviewOut],
+    response_model_exclude_unset=True,
     summary="Query all MoviePreview records",
 )
-async def list_all(
+def list_all(
     request: Request,
     response: Response,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: MoviePreviewOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    total = repository.movie_preview.find_all(
-        pagination, MoviePreviewFilter.from_query(request), order_by, True
-    )
-    items = repository.movie_preview.find_all(
-        pagination, MoviePreviewFilter.from_query(request), order_by
-    )
-    return PaginatedData(
-        items=[MoviePreviewOut.from_orm(item) for item in items], total=total
+    fields = projection.names(MoviePreviewOut)
+    page = repository.movie_preview.paginate(
+        pagination,
+        MoviePreviewFilter.from_query(request),
+        order_by,
+        out=MoviePreviewOut,
+        fields=fields,
     )
+    return PaginatedData.from_page(page, MoviePreviewOut, fields)
 
 
 @router.get(
     "/{id}",
     name="movie_previews:get",
     response_model=MoviePreviewOut,
+    response_model_exclude_unset=True,
     summary="Get MoviePreview by id",
 )
-async def get_by_id(
+def get_by_id(
     id: int = Path(...),
-    exclude: Set[str] = Query({}),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    return repository.movie_preview.find_by_id(id)
+    fields = projection.names(MoviePreviewOut)
+    movie_preview = repository.movie_preview.find_by_id(
+        id, out=MoviePreviewOut, fields=fields
+    )
+    return project(MoviePreviewOut, movie_preview, fields)
 
 
 @router.post(
@@ -68,7 +79,7 @@ async def get_by_id(
     status_code=HTTP_201_CREATED,
     summary="Create new MoviePreview",
 )
-async def create_new(
+def create_new(
     movie_preview_in: MoviePreviewIn = Depends(movie_preview_in_form),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -81,11 +92,11 @@ async def create_new(
     response_model=MoviePreviewOut,
     summary="Update MoviePreview by id",
 )
-async def update(
+def update(
     movie_preview_in: MoviePreviewIn = Depends(movie_preview_in_form),
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie_preview:edit"])),
+    user: Principal = Depends(authorize(["movie_preview:edit"])),
 ):
     return repository.movie_preview.update(id, movie_preview_in)
 
@@ -96,11 +107,11 @@ async def update(
     response_model=MoviePreviewOut,
     summary="Partial Update MoviePreview by id",
 )
-async def patch_update(
+def patch_update(
     movie_preview_in: MoviePreviewPatchBody,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie_preview:edit"])),
+    user: Principal = Depends(authorize(["movie_preview:edit"])),
 ):
     return repository.movie_preview.patch(id, movie_preview_in)
 
@@ -111,11 +122,11 @@ async def patch_update(
     response_model=MoviePreviewOut,
     summary="Update MoviePreview images by id",
 )
-async def update_images(
+def update_images(
     images: Optional[List[UploadFile]] = File([]),
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie_preview:edit"])),
+    user: Principal = Depends(authorize(["movie_preview:edit"])),
 ):
     movie_preview = repository.movie_preview.find_by_id(id)
     movie_preview.images = [FileInfo(content=_f) for _f in images]
@@ -128,10 +139,10 @@ async def update_images(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete MoviePreview images",
 )
-async def delete_images(
+def delete_images(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie_preview:edit"])),
+    user: Principal = Depends(authorize(["movie_preview:edit"])),
 ):
     movie_preview = repository.movie_preview.find_by_id(id)
     movie_preview.images = None
@@ -145,11 +156,11 @@ async def delete_images(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete MoviePreview by id",
 )
-async def delete_movie_preview(
+def delete_movie_preview(
     request: Request,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie_preview:delete"])),
+    user: Principal = Depends(authorize(["movie_preview:delete"])),
 ):
     repository.movie_preview.delete(MoviePreviewFilter.from_query(request))
     return Response(status_code=HTTP_204_NO_CONTENT)
@@ -161,7 +172,7 @@ async def delete_movie_preview(
     response_model=MovieOutWithoutRelations,
     summary="Get linked movie(Movie)",
 )
-async def get_movie(
+def get_movie(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -177,11 +188,11 @@ async def get_movie(
     response_model=MovieOutWithoutRelations,
     summary="Linked with movie(Movie) by id",
 )
-async def link_movie(
+def link_movie(
     id: int = Path(...),
     movie_id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie_preview:edit"])),
+    user: Principal = Depends(authorize(["movie_preview:edit"])),
 ):
     movie_preview = repository.movie_preview.find_by_id(id)
     movie = repository.movie.find_by_id(movie_id)
@@ -198,10 +209,10 @@ async def link_movie(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete linked movie(Movie)",
 )
-async def delete_movie(
+def delete_movie(
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
-    user: User = Depends(authorize(["movie_preview:edit"])),
+    user: Principal = Depends(authorize(["movie_preview:edit"])),
 ):
     movie_preview = repository.movie_preview.find_by_id(id)
     movie_preview.movie = None
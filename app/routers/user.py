@@ -1,49 +1,63 @@
-from typing import Optional, Set
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Path, Query, Request, Response
-from pydantic import Json
 from starlette.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT
 
 from app.dependencies import repository_manager
 from app.filters.user import UserFilter, UserOrderBy
-from app.internal.filters import PaginationQuery
+from app.internal.filters import PaginationQuery, Projection
 from app.internal.repository_manager import RepositoryManager
-from app.internal.response import PaginatedData
+from app.internal.response import PaginatedData, project
+from app.internal.routing import SessionRoute
 from app.models.user import UserIn, UserOut, UserPatchBody, UserRegister
 
-router = APIRouter(prefix="/api/users", tags=["users-controller"])
+router = APIRouter(
+    prefix="/api/users", tags=["users-controller"], route_class=SessionRoute
+)
 
 
 @router.get(
     "",
     name="users:list",
     response_model=PaginatedData[UserOut],
+    response_model_exclude_unset=True,
     summary="Query all User records",
 )
-async def list_all(
+def list_all(
     request: Request,
     response: Response,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     order_by: UserOrderBy = Depends(),
     pagination: PaginationQuery = Depends(),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    total = repository.user.find_all(
-        pagination, UserFilter.from_query(request), order_by, True
-    )
-    items = repository.user.find_all(
-        pagination, UserFilter.from_query(request), order_by
+    fields = projection.names(UserOut)
+    page = repository.user.paginate(
+        pagination,
+        UserFilter.from_query(request),
+        order_by,
+        out=UserOut,
+        fields=fields,
     )
-    return PaginatedData(items=[UserOut.from_orm(item) for item in items], total=total)
+    return PaginatedData.from_page(page, UserOut, fields)
 
 
-@router.get("/{id}", name="users:get", response_model=UserOut, summary="Get User by id")
-async def get_by_id(
+@router.get(
+    "/{id}",
+    name="users:get",
+    response_model=UserOut,
+    response_model_exclude_unset=True,
+    summary="Get User by id",
+)
+def get_by_id(
     id: int = Path(...),
-    exclude: Set[str] = Query({}),
+    projection: Projection = Depends(),
     repository: RepositoryManager = Depends(repository_manager),
 ):
-    return repository.user.find_by_id(id)
+    fields = projection.names(UserOut)
+    user = repository.user.find_by_id(id, out=UserOut, fields=fields)
+    return project(UserOut, user, fields)
 
 
 @router.post(
@@ -53,7 +67,7 @@ async def get_by_id(
     status_code=HTTP_201_CREATED,
     summary="Create new User",
 )
-async def create_new_user(
+def create_new_user(
     user_in: UserRegister,
     repository: RepositoryManager = Depends(repository_manager),
 ):
@@ -63,7 +77,7 @@ async def create_new_user(
 @router.put(
     "/{id}", name="users:update", response_model=UserOut, summary="Update User by id"
 )
-async def update(
+def update(
     user_in: UserIn,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -77,7 +91,7 @@ async def update(
     response_model=UserOut,
     summary="Partial Update User by id",
 )
-async def patch_update(
+def patch_update(
     user_in: UserPatchBody,
     id: int = Path(...),
     repository: RepositoryManager = Depends(repository_manager),
@@ -91,9 +105,9 @@ async def patch_update(
     status_code=HTTP_204_NO_CONTENT,
     summary="Delete User by id",
 )
-async def delete_user(
+def delete_user(
     request: Request,
-    where: Optional[Json] = Query(None),
+    where: Optional[str] = Query(None),
     repository: RepositoryManager = Depends(repository_manager),
 ):
     repository.user.delete(UserFilter.from_query(request))
@@ -7,13 +7,14 @@ from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
 
 from app.config import config
 from app.dependencies import repository_manager
+from app.internal.cache import principal_cache
 from app.internal.repository_manager import RepositoryManager
 
 security = HTTPBearer()
 
 
 def authorize(roles: Optional[List[str]] = []):
-    def auth_wrapper(
+    async def auth_wrapper(
         credentials: HTTPAuthorizationCredentials = Security(security),
         repository: RepositoryManager = Depends(repository_manager),
     ):
@@ -23,12 +24,15 @@ def authorize(roles: Optional[List[str]] = []):
             )
             if payload.get("type") != "access_token":
                 raise JWTError()
-            user = repository.user.find_by_id(payload.get("sub"))
-            if not user.has_permission(roles):
+            id = int(payload.get("sub"))
+            principal = principal_cache.get(principal_cache.key(id))
+            if principal is None:
+                principal = await repository.run(repository.user.find_principal, id)
+            if not principal.has_permission(roles):
                 raise HTTPException(
                     status_code=HTTP_403_FORBIDDEN, detail=f"Access Forbidden"
                 )
-            return user
+            return principal
         except JWTError as e:
             raise HTTPException(
                 status_code=HTTP_401_UNAUTHORIZED,
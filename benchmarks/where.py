@@ -0,0 +1,82 @@
+"""
+Cost of parsing a `where` filter, per call, for typical and pathological
+filters: the querystring_parser/parse_raw path it replaced, a miss of the
+cross-request cache and a hit.
+
+    python -m benchmarks.where
+"""
+import json
+import timeit
+from urllib.parse import parse_qsl, urlencode
+
+from querystring_parser import parser
+
+from app.filters.movie import MovieFilter
+from app.internal.filters import _from_params, _parse
+
+
+def _pathological_json() -> str:
+    where = {"id": {"in": list(range(50))}}
+    for i in range(12):
+        where = {
+            "or": [where, {"name": {"contains": str(i)}}],
+            "not": {"watch_count": {"eq": i}},
+        }
+    return urlencode({"where": json.dumps(where)})
+
+
+TYPICAL = {
+    "watch_count": {"ge": 3},
+    "name": {"contains": "movie"},
+    "category": {"id": 2},
+}
+
+CASES = [
+    (
+        "typical brackets",
+        "where[watch_count][ge]=3&where[name][contains]=movie&where[category][id]=2",
+        2000,
+    ),
+    ("typical json", urlencode({"where": json.dumps(TYPICAL)}), 2000),
+    (
+        "pathological brackets",
+        "&".join(f"where[id][in][{i}]={i}" for i in range(200))
+        + "&where[or][0][authors][category][name][eq]=x"
+        + "&where[or][1][not][name][like]=y",
+        200,
+    ),
+    ("pathological json", _pathological_json(), 200),
+]
+
+
+def old(query_string: str):
+    params = dict(parse_qsl(query_string))
+    if "where" in params:
+        return MovieFilter.parse_raw(params["where"])
+    return MovieFilter(**parser.parse(query_string, normalized=True)["where"])
+
+
+def new(query_string: str, cached: bool):
+    if not cached:
+        _parse.cache_clear()
+    return _from_params(MovieFilter, parse_qsl(query_string))
+
+
+def per_call(fn, number: int) -> float:
+    return timeit.timeit(fn, number=number) / number * 1e6
+
+
+def main() -> None:
+    print(f"{'':24}{'old':>10}{'miss':>10}{'hit':>10}")
+    for name, query_string, number in CASES:
+        try:
+            before = f"{per_call(lambda: old(query_string), number):.0f}us"
+        except Exception as e:
+            before = type(e).__name__
+        miss = per_call(lambda: new(query_string, False), number)
+        hit = per_call(lambda: new(query_string, True), number)
+        print(f"{name:24}{before:>10}{miss:>8.0f}us{hit:>8.0f}us")
+
+
+if __name__ == "__main__":
+    main()
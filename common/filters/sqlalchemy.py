@@ -9,51 +9,38 @@ from common.filters.base import BaseModelFilter
 from common.filters.exceptions import InvalidQueryArgs
 from common.filters.fields import AnyFilter, FieldFilterBase, HasFilter
 
+OPERATORS = {
+    "eq": lambda p, v: p == v,
+    "ge": lambda p, v: p >= v,
+    "gt": lambda p, v: p > v,
+    "between": lambda p, v: p.between(*v),
+    "not_between": lambda p, v: not_(p.between(*v)),
+    "le": lambda p, v: p <= v,
+    "lt": lambda p, v: p < v,
+    "like": lambda p, v: p.like(v),
+    "not_like": lambda p, v: p.not_like(v),
+    "ilike": lambda p, v: p.ilike(v),
+    "not_ilike": lambda p, v: p.not_ilike(v),
+    "in_": lambda p, v: p.in_(v),
+    "not_in": lambda p, v: p.not_in(v),
+    "contains": lambda p, v: p.contains(v),
+    "startsWith": lambda p, v: p.startswith(v),
+    "endsWith": lambda p, v: p.endswith(v),
+    "neq": lambda p, v: p != v,
+    "is_": lambda p, v: p.is_(v),
+    "is_not": lambda p, v: p.is_not(v),
+}
+
 
 class SQLAlchemyModelFilter(BaseModelFilter):
     __cls__ = None
 
     def _exp_from(self, field_filter: FieldFilterBase, p: InstrumentedAttribute):
-        values = []
-        for field in field_filter.__fields_set__:
-            if field == "eq":
-                values.append(p == getattr(field_filter, field))
-            elif field == "ge":
-                values.append(p >= getattr(field_filter, field))
-            elif field == "gt":
-                values.append(p > getattr(field_filter, field))
-            elif field == "between":
-                values.append(p.between(*getattr(field_filter, field)))
-            elif field == "not_between":
-                values.append(not_(p.between(*getattr(field_filter, field))))
-            elif field == "le":
-                values.append(p <= getattr(field_filter, field))
-            elif field == "lt":
-                values.append(p < getattr(field_filter, field))
-            elif field == "like":
-                values.append(p.like(getattr(field_filter, field)))
-            elif field == "not_like":
-                values.append(p.not_like(getattr(field_filter, field)))
-            elif field == "ilike":
-                values.append(p.ilike(getattr(field_filter, field)))
-            elif field == "not_ilike":
-                values.append(p.not_ilike(getattr(field_filter, field)))
-            elif field == "in_":
-                values.append(p.in_(getattr(field_filter, field)))
-            elif field == "not_in":
-                values.append(p.not_in(getattr(field_filter, field)))
-            elif field == "contains":
-                values.append(p.contains(getattr(field_filter, field)))
-            elif field == "startsWith":
-                values.append(p.startswith(getattr(field_filter, field)))
-            elif field == "endsWith":
-                values.append(p.endswith(getattr(field_filter, field)))
-            elif field == "neq":
-                values.append(p != getattr(field_filter, field))
-            elif field == "is_":
-                values.append(p.is_(getattr(field_filter, field)))
-            elif field == "is_not":
-                values.append(p.is_not(getattr(field_filter, field)))
+        values = [
+            OPERATORS[field](p, getattr(field_filter, field))
+            for field in field_filter.__fields_set__
+            if field in OPERATORS
+        ]
         if len(values) == 1:
             return values[0]
         return and_(*values)
@@ -70,19 +57,23 @@ class SQLAlchemyModelFilter(BaseModelFilter):
                 filters.append(and_(*[v.to_query() for v in attr]))
             elif field == "not_":
                 filters.append(not_(attr.to_query()))
+            elif callable(getattr(self, f"query_{field}", None)):
+                # filters declare query_<field> for fields that aren't columns
+                filters.append(getattr(self, f"query_{field}")(attr))
             else:
                 p: InstrumentedAttribute = getattr(self.__cls__, field)
                 assert (
                     type(p) is InstrumentedAttribute
                 ), f"{self.__cls__} is Invalid SQLAlchemy model"
-                if isinstance(attr, FieldFilterBase):
-                    filters.append(self._exp_from(attr, p))
-                elif isinstance(attr, bool):
-                    filters.append((p == true()) if attr else (p == false()))
-                elif isinstance(attr, HasFilter):
+                # Has/Any filters are FieldFilterBase too, test them first
+                if isinstance(attr, HasFilter):
                     filters.append(p.has(attr.to_query()))
                 elif isinstance(attr, AnyFilter):
                     filters.append(p.any(attr.to_query()))
+                elif isinstance(attr, FieldFilterBase):
+                    filters.append(self._exp_from(attr, p))
+                elif isinstance(attr, bool):
+                    filters.append((p == true()) if attr else (p == false()))
                 else:
                     filters.append(p == attr)
         if len(filters) == 1:
@@ -0,0 +1,43 @@
+"""relation counters
+
+Revision ID: 8118fa2d2646
+Revises: 6a3a72642aea
+Create Date: 2026-10-18 08:38:05.318204+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8118fa2d2646"
+down_revision = "6a3a72642aea"
+branch_labels = None
+depends_on = None
+
+# table, counter column, counted table, its foreign key
+COUNTERS = [
+    ("category", "movies_count", "movie", "category_id"),
+    ("manager", "authors_count", "author", "manager_id"),
+    ("movie", "authors_count", "movies_authors_link", "movie_id"),
+    ("author", "movies_count", "movies_authors_link", "author_id"),
+    ("author", "friends_count", "friends_of_friends_link", "author1_id"),
+    ("author", "friends_of_count", "friends_of_friends_link", "author2_id"),
+]
+
+
+def upgrade():
+    for table, column, _, _ in COUNTERS:
+        op.add_column(
+            table, sa.Column(column, sa.INTEGER(), server_default="0", nullable=False)
+        )
+    for table, column, child, fk in COUNTERS:
+        op.execute(
+            f"UPDATE {table} SET {column} = "
+            f"(SELECT count(*) FROM {child} WHERE {child}.{fk} = {table}.id)"
+        )
+
+
+def downgrade():
+    for table, column, _, _ in reversed(COUNTERS):
+        op.drop_column(table, column)
@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.config import config
+from app.database import db
+from app.internal.base_models import BaseSQLModel
+from app.internal.cache import MemoryBackend, use_backend
+from app.main import app
+from app.models.category import Category
+from app.models.manager import Manager
+from app.models.movie import Movie
+from app.models.user import User
+from app.services.password import hash_password
+
+PASSWORD = "Admin123!"
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """A SQLite database serving the app, with an empty cache"""
+    engine = db._create_engine(f"sqlite:///{tmp_path / 'test.db'}", "primary")
+    engine.echo = False
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "replicas", [])
+    monkeypatch.setattr(db, "async_engine", None)
+    BaseSQLModel.metadata.create_all(engine)
+    use_backend(MemoryBackend(config.cache.max_entries))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(engine):
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth(client, session):
+    """Headers of a superuser"""
+    session.add(
+        User(
+            username="admin",
+            password=hash_password(PASSWORD),
+            is_superuser=True,
+            roles=[],
+        )
+    )
+    session.commit()
+    response = client.post(
+        "/auth/login", json=dict(username="admin", password=PASSWORD)
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def movies(session):
+    """Two categories, a manager and three movies"""
+    categories = [Category(name="drama"), Category(name="comedy")]
+    session.add_all(categories)
+    session.add(Manager(lastname="Doe", firstname="Jane"))
+    session.commit()
+    movies = [
+        Movie(name=f"movie{i}", category_id=categories[i % 2].id, tags=[])
+        for i in range(3)
+    ]
+    session.add_all(movies)
+    session.commit()
+    return [movie.id for movie in movies]
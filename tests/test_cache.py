@@ -0,0 +1,28 @@
+from app.config import config
+from app.internal.cache import coherent, entity_cache, query_cache
+
+
+def _hits() -> tuple:
+    return entity_cache.stats()["hits"], query_cache.stats()["hits"]
+
+
+def _read_twice(client, id: int) -> None:
+    for _ in range(2):
+        response = client.get(f"/api/movies/{id}", params=[("fields", "name")])
+        assert response.json() == dict(name="movie0")
+        assert client.get("/api/movies", params=dict(limit=2)).status_code == 200
+
+
+def test_single_process_caches_by_default(client, movies):
+    assert coherent()
+    entity, query = _hits()
+    _read_twice(client, movies[0])
+    assert _hits() == (entity + 1, query + 1)
+
+
+def test_several_processes_skip_the_in_process_backend(client, movies, monkeypatch):
+    monkeypatch.setattr(config.cache, "single_process", False)
+    assert not coherent()
+    hits = _hits()
+    _read_twice(client, movies[0])
+    assert _hits() == hits
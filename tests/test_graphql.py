@@ -0,0 +1,44 @@
+from app.internal.repository_manager import RepositoryManager
+
+MANAGER = "{ Manager { items { id lastname } } }"
+
+
+def test_batch_reads_what_its_mutation_wrote(client, auth, movies, monkeypatch):
+    forks = []
+    fork = RepositoryManager.fork
+    monkeypatch.setattr(
+        RepositoryManager, "fork", lambda self: forks.append(self) or fork(self)
+    )
+    update = """
+        mutation {
+            update_Manager(id: 1, input: {lastname: "Roe", firstname: "Jane"}) {
+                lastname
+            }
+        }
+    """
+    total = {"query": "{ Movie { total } }"}
+    batch = [total, {"query": MANAGER}, {"query": update}, {"query": MANAGER}]
+    response = client.post("/graphql", json=batch, headers=auth)
+    assert response.status_code == 200
+    _, before, updated, after = response.json()
+    assert before["data"]["Manager"]["items"] == [dict(id=1, lastname="Doe")]
+    assert updated["data"]["update_Manager"] == dict(lastname="Roe")
+    assert after["data"]["Manager"]["items"] == [dict(id=1, lastname="Roe")]
+    # a fork kept from before the mutation would read an older snapshot
+    assert forks == []
+
+
+def test_batch_of_queries_runs_concurrently(client, movies, monkeypatch):
+    forks = []
+    fork = RepositoryManager.fork
+    monkeypatch.setattr(
+        RepositoryManager, "fork", lambda self: forks.append(self) or fork(self)
+    )
+    batch = [{"query": MANAGER}, {"query": "{ Movie { total } }"}]
+    response = client.post("/graphql", json=batch)
+    assert response.status_code == 200
+    assert [result["data"] for result in response.json()] == [
+        {"Manager": {"items": [dict(id=1, lastname="Doe")]}},
+        {"Movie": {"total": 3}},
+    ]
+    assert len(forks) == 1